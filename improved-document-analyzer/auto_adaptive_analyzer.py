@@ -9,10 +9,151 @@ import json
 import os
 import re
 from datetime import datetime
-from typing import List, Dict, Any, Tuple
-import PyPDF2
+from typing import List, Dict, Any, Tuple, Iterator, Optional
 from collections import Counter, defaultdict
-import math
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from bisect import bisect_right
+
+from pdf_text import extract_page_texts
+from text_matching import CASE_FOLD_EXCEPTION_RE
+
+# Optional Aho-Corasick automaton for the literal keyword scans; the union
+# patterns below are used when pyahocorasick is not installed
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Optional RE2 engine for the window pattern scans; stdlib re is used when
+# google-re2 is not installed
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# Per-scorer union patterns: each scorer makes a single pass over the text
+# and reads the element category from the name of the matching group
+_STRUCTURAL_ELEMENTS_RE = re.compile(
+    r'(?P<numbered_lists>^\s*\d+\.\s+)'
+    r'|(?P<bullet_points>^\s*[•\-\*]\s+)'
+    r'|(?P<sub_lists>^\s*[a-z]\)\s+)'
+    r'|(?P<headers>^[A-Z][A-Z\s]{5,}$)',
+    re.MULTILINE
+)
+
+_SEQUENTIAL_WORDS = ('first', 'second', 'third', 'next', 'then', 'finally', 'after', 'before')
+_CONDITIONAL_WORDS = ('if', 'when', 'unless', 'should', 'depending', 'based on')
+_UI_ACTION_WORDS = ('click', 'select', 'choose', 'press', 'drag', 'drop', 'type', 'enter', 'hover', 'scroll')
+_UI_ELEMENT_WORDS = ('button', 'menu', 'toolbar', 'panel', 'dialog', 'window', 'field', 'checkbox', 'dropdown', 'tab')
+_SPECIFIC_UI_PHRASES = ('All tools', 'File menu', 'Edit menu', 'View menu', 'Properties panel')
+
+# The keyword unions run on lowercased content. The indentation is matched
+# without its first character so that a keyword starting an indented line
+# is still counted
+_PROCEDURAL_ELEMENTS_PATTERN = (
+    r'\b(?P<sequential_words>' + '|'.join(_SEQUENTIAL_WORDS) + r')\b'
+    r'|\b(?P<conditional_words>' + '|'.join(_CONDITIONAL_WORDS) + r')\b'
+    r'|(?P<indented_lines>^\s{4,})(?=[^\s])'
+)
+
+_UI_INTERACTION_PATTERN = (
+    r'\b(?:(?P<specific_ui>' + '|'.join(_SPECIFIC_UI_PHRASES).lower() + ')'
+    r'|(?P<ui_actions>' + '|'.join(_UI_ACTION_WORDS) + ')'
+    r'|(?P<ui_elements>' + '|'.join(_UI_ELEMENT_WORDS) + r'))\b'
+)
+
+_PROCEDURAL_ELEMENTS_RE = re.compile(_PROCEDURAL_ELEMENTS_PATTERN, re.MULTILINE)
+_UI_INTERACTION_RE = re.compile(_UI_INTERACTION_PATTERN)
+
+# Case-insensitive unions for content that lower() cannot stand in for
+_PROCEDURAL_ELEMENTS_FOLDING_RE = re.compile(_PROCEDURAL_ELEMENTS_PATTERN, re.IGNORECASE | re.MULTILINE)
+_UI_INTERACTION_FOLDING_RE = re.compile(_UI_INTERACTION_PATTERN, re.IGNORECASE)
+
+_INDENTED_LINE_RE = re.compile(r'^\s{4,}[^\s]', re.MULTILINE)
+
+# RE2 only knows ASCII word characters, so its \b agrees with stdlib re
+# unless the text contains a non-ASCII word character
+_NON_ASCII_WORD_RE = re.compile(r'[^\W\x00-\x7f]')
+
+# Required patterns that are a plain alternation of whole lowercase words
+_LITERAL_WORDS_PATTERN_RE = re.compile(r'\\b\(\?:([a-z]+(?:\|[a-z]+)*)\)\\b')
+
+# Prefix of the line-anchored numbered step patterns
+_NUMBERED_STEP_PREFIX = r'^\s*\d+\.'
+
+# Document type indicators that match a single whole-word alternation
+_WHOLE_WORD_INDICATOR_RE = re.compile(r'\\b\(\?:[\w\\|+{}]+\)\\b')
+
+_KEYWORD_CATEGORIES = (
+    ('sequential_words', _SEQUENTIAL_WORDS),
+    ('conditional_words', _CONDITIONAL_WORDS),
+    ('ui_actions', _UI_ACTION_WORDS),
+    ('ui_elements', _UI_ELEMENT_WORDS),
+    ('specific_ui', _SPECIFIC_UI_PHRASES),
+)
+
+if ahocorasick is not None:
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _category, _keywords in _KEYWORD_CATEGORIES:
+        for _keyword in _keywords:
+            _KEYWORD_AUTOMATON.add_word(_keyword.lower(), (_category, len(_keyword)))
+    _KEYWORD_AUTOMATON.make_automaton()
+else:
+    _KEYWORD_AUTOMATON = None
+
+# Title scoring patterns
+_TITLE_FORM_WORDS = ('form', 'field', 'fillable', 'signature', 'workflow')
+_TITLE_FORM_ACTION_WORDS = ('create', 'prepare', 'design', 'manage')
+_TITLE_COLLABORATION_WORDS = ('share', 'collaborate', 'review', 'comment', 'approve')
+_TITLE_TEAM_WORDS = ('team', 'group', 'workflow', 'process')
+_TITLE_PRODUCTION_WORDS = ('create', 'convert', 'generate', 'export', 'produce')
+_TITLE_DOCUMENT_WORDS = ('document', 'pdf', 'file', 'content')
+_TITLE_PRODUCT_WORDS = ('adobe', 'acrobat', 'pdf')
+
+_TITLE_FORM_RE = re.compile(r'\b(?:' + '|'.join(_TITLE_FORM_WORDS) + r')\b', re.IGNORECASE)
+_TITLE_FORM_ACTION_RE = re.compile(r'\b(?:' + '|'.join(_TITLE_FORM_ACTION_WORDS) + r')\b', re.IGNORECASE)
+_TITLE_COLLABORATION_RE = re.compile(r'\b(?:' + '|'.join(_TITLE_COLLABORATION_WORDS) + r')\b', re.IGNORECASE)
+_TITLE_TEAM_RE = re.compile(r'\b(?:' + '|'.join(_TITLE_TEAM_WORDS) + r')\b', re.IGNORECASE)
+_TITLE_PRODUCTION_RE = re.compile(r'\b(?:' + '|'.join(_TITLE_PRODUCTION_WORDS) + r')\b', re.IGNORECASE)
+_TITLE_DOCUMENT_RE = re.compile(r'\b(?:' + '|'.join(_TITLE_DOCUMENT_WORDS) + r')\b', re.IGNORECASE)
+_TITLE_PRODUCT_RE = re.compile(r'\b(?:' + '|'.join(_TITLE_PRODUCT_WORDS) + r')\b', re.IGNORECASE)
+_TITLE_CAPITALIZED_RE = re.compile(r'^[A-Z]')
+_TITLE_NUMBERED_RE = re.compile(r'^\d+\.')
+_TITLE_NUMBER_PREFIX_RE = re.compile(r'^\d+[\.\)]\s*')
+_TITLE_BULLET_PREFIX_RE = re.compile(r'^[•\-\*\+]\s*')
+
+def _mentions_any(line: str, line_lower: str, words: Tuple[str, ...], pattern) -> bool:
+    """Check for a whole-word keyword, running the regex only when a keyword occurs as a substring"""
+    
+    # Case folding of non-ASCII text can differ from lower(), so such lines always use the regex
+    if line_lower.isascii() and not any(word in line_lower for word in words):
+        return False
+    
+    return pattern.search(line) is not None
+
+def _lower_for_matching(content: str) -> Optional[str]:
+    """Lowercase content for the case-sensitive scans, or None when lower() disagrees with case-insensitive matching"""
+    
+    # İ, ı and ſ fold differently under re.IGNORECASE, so content containing them is scanned as is
+    if CASE_FOLD_EXCEPTION_RE.search(content):
+        return None
+    
+    return content.lower()
+
+def _lowercase_pattern(pattern: str) -> str:
+    """Lowercase the literal letters of a regex pattern, leaving escape sequences intact"""
+    
+    return re.sub(r'\\.|[A-Z]', lambda match: match.group() if len(match.group()) > 1 else match.group().lower(), pattern)
+
+def _extract_all_pages(pdf_path: str) -> List[str]:
+    """Extract the text of every page of a PDF document (runs in a worker process)"""
+    
+    page_texts, error = extract_page_texts(pdf_path)
+    if error is not None:
+        print(f"Error reading {pdf_path}: {error}")
+        return []
+    return page_texts
 
 class AutoAdaptiveDocumentAnalyzer:
     def __init__(self):
@@ -128,22 +269,92 @@ class AutoAdaptiveDocumentAnalyzer:
             'procedural_depth': 0.20,   # Depth and complexity of procedures
             'ui_interaction': 0.15      # Level of UI interaction described
         }
+        
+        # Compile signature and persona-job patterns once up front
+        # Whole-word indicators never overlap each other, so they share a single scan
+        scanned_indicators = []
+        for doc_type, signature in self.document_signatures.items():
+            signature['separate_indicators'] = []
+            for index, pattern in enumerate(signature['structural_indicators']):
+                if _WHOLE_WORD_INDICATOR_RE.fullmatch(pattern):
+                    scanned_indicators.append(f'(?P<{doc_type}_{index}>{pattern})')
+                else:
+                    signature['separate_indicators'].append(re.compile(pattern, re.IGNORECASE))
+            signature['structural_indicators'] = [
+                re.compile(pattern, re.IGNORECASE) for pattern in signature['structural_indicators']
+            ]
+        self.document_indicator_scanner = re.compile('|'.join(scanned_indicators), re.IGNORECASE)
+        
+        for jobs in self.persona_job_matrix.values():
+            for job_config in jobs.values():
+                job_config['required_patterns'] = [
+                    re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in job_config['required_patterns']
+                ]
+                
+                # Numbered step patterns are only tried at lines that begin with a digit
+                job_config['numbered_step_patterns'] = [
+                    pattern for pattern in job_config['required_patterns']
+                    if pattern.pattern.startswith(_NUMBERED_STEP_PREFIX)
+                ]
+                
+                # The remaining patterns run case-sensitively on lowercased window content.
+                # Whole-word alternations share one union scan, where each matched word
+                # counts once for every pattern that lists it
+                literal_word_weights = Counter()
+                unanchored_sources = []
+                for pattern in job_config['required_patterns']:
+                    if pattern.pattern.startswith(_NUMBERED_STEP_PREFIX):
+                        continue
+                    source = _lowercase_pattern(pattern.pattern)
+                    literal_match = _LITERAL_WORDS_PATTERN_RE.fullmatch(source)
+                    if literal_match:
+                        literal_word_weights.update(dict.fromkeys(literal_match.group(1).split('|'), 1))
+                    else:
+                        unanchored_sources.append((source, None))
+                if literal_word_weights:
+                    unanchored_sources.insert(0, (r'\b(?:' + '|'.join(literal_word_weights) + r')\b', literal_word_weights))
+                
+                job_config['unanchored_patterns'] = [
+                    (re.compile(source, re.MULTILINE), word_weights) for source, word_weights in unanchored_sources
+                ]
+                job_config['case_insensitive_patterns'] = [
+                    (pattern, None) for pattern in job_config['required_patterns']
+                    if not pattern.pattern.startswith(_NUMBERED_STEP_PREFIX)
+                ]
+                job_config['re2_patterns'] = [
+                    (re2.compile(source), word_weights) for source, word_weights in unanchored_sources
+                ] if re2 is not None else None
+        
+        # Flat persona-job lookup table sharing the compiled job configurations
+        self.job_configs = {
+            (persona, job): job_config
+            for persona, jobs in self.persona_job_matrix.items()
+            for job, job_config in jobs.items()
+        }
 
-    def auto_detect_document_type(self, all_content: str) -> str:
+    def auto_detect_document_type(self, all_content: str, word_count: int = None) -> str:
         """Automatically detect the document type based on structural patterns"""
         
         type_scores = {}
-        word_count = len(all_content.split())
+        if word_count is None:
+            word_count = len(all_content.split())
         
         if word_count == 0:
             return 'general'
         
+        # Count the fused whole-word indicators in one pass over the content
+        scanned_counts = Counter()
+        for group_name, matches in Counter(
+            match.lastgroup for match in self.document_indicator_scanner.finditer(all_content)
+        ).items():
+            scanned_counts[group_name.rsplit('_', 1)[0]] += matches
+        
         for doc_type, signature in self.document_signatures.items():
-            score = 0.0
+            score = float(scanned_counts[doc_type])
             
-            # Count pattern matches
-            for pattern in signature['structural_indicators']:
-                matches = len(re.findall(pattern, all_content, re.IGNORECASE))
+            # Count the remaining pattern matches
+            for pattern in signature['separate_indicators']:
+                matches = len(pattern.findall(all_content))
                 score += matches
             
             # Normalize by content length
@@ -155,12 +366,16 @@ class AutoAdaptiveDocumentAnalyzer:
         
         return max(type_scores.items(), key=lambda x: x[1])[0]
 
-    def auto_select_optimal_persona_job(self, document_type: str, all_content: str) -> Tuple[str, str]:
+    def auto_select_optimal_persona_job(self, document_type: str, all_content: str, word_count: int = None) -> Tuple[str, str]:
         """Automatically select the optimal persona-job combination"""
         
         if document_type not in self.document_signatures:
             return 'business_professional', 'content_production'
         
+        # Tokenize the content once for all candidate combinations
+        if word_count is None:
+            word_count = len(all_content.split())
+        
         signature = self.document_signatures[document_type]
         optimal_personas = signature['optimal_personas']
         optimal_jobs = signature['optimal_jobs']
@@ -174,7 +389,7 @@ class AutoAdaptiveDocumentAnalyzer:
             if persona in self.persona_job_matrix:
                 for job in self.persona_job_matrix[persona]:
                     if job in optimal_jobs:
-                        score = self.score_persona_job_fit(all_content, persona, job)
+                        score = self.score_persona_job_fit(all_content, persona, job, word_count)
                         if score > best_score:
                             best_score = score
                             best_persona = persona
@@ -182,36 +397,25 @@ class AutoAdaptiveDocumentAnalyzer:
         
         return best_persona, best_job
 
-    def score_persona_job_fit(self, content: str, persona: str, job: str) -> float:
+    def score_persona_job_fit(self, content: str, persona: str, job: str, word_count: int = None) -> float:
         """Score how well content fits a persona-job combination"""
         
-        if persona not in self.persona_job_matrix:
+        job_config = self.job_configs.get((persona, job))
+        if job_config is None:
             return 0.0
         
-        if job not in self.persona_job_matrix[persona]:
-            return 0.0
-        
-        job_config = self.persona_job_matrix[persona][job]
-        
-        # Calculate pattern match score
-        pattern_score = 0.0
-        for pattern in job_config['required_patterns']:
-            matches = len(re.findall(pattern, content, re.IGNORECASE | re.MULTILINE))
-            pattern_score += matches
+        features = self.count_window_features(content, job_config, word_count)
+        word_count = features['word_count']
         
         # Normalize pattern score
-        word_count = len(content.split())
+        pattern_score = float(features['pattern_matches'])
         if word_count > 0:
             pattern_score = (pattern_score / word_count) * 1000
         
-        # Calculate structural quality score
-        structural_score = self.calculate_structural_quality(content)
-        
-        # Calculate procedural depth score
-        procedural_score = self.calculate_procedural_depth(content)
-        
-        # Calculate UI interaction score
-        ui_score = self.calculate_ui_interaction_level(content)
+        # Calculate structural quality, procedural depth and UI interaction scores
+        structural_score, procedural_score, ui_score = self.element_scores_from_counts(
+            features['structural'], features['keywords'], word_count
+        )
         
         # Weighted combination
         final_score = (
@@ -223,103 +427,149 @@ class AutoAdaptiveDocumentAnalyzer:
         
         return final_score
 
-    def calculate_structural_quality(self, content: str) -> float:
-        """Calculate the structural quality of content"""
+    def count_structural_elements(self, content: str) -> Counter:
+        """Count numbered lists, bullet points, sub-lists and headers in content"""
         
-        # Count structural elements
-        numbered_lists = len(re.findall(r'^\s*\d+\.\s+', content, re.MULTILINE))
-        bullet_points = len(re.findall(r'^\s*[•\-\*]\s+', content, re.MULTILINE))
-        sub_lists = len(re.findall(r'^\s*[a-z]\)\s+', content, re.MULTILINE))
-        headers = len(re.findall(r'^[A-Z][A-Z\s]{5,}$', content, re.MULTILINE))
+        return Counter(match.lastgroup for match in _STRUCTURAL_ELEMENTS_RE.finditer(content))
+
+    def count_keyword_elements(self, content: str) -> Counter:
+        """Count the procedural and UI interaction elements in content"""
         
-        # Calculate quality score
-        quality_score = (
-            numbered_lists * 1.2 +
-            bullet_points * 1.0 +
-            sub_lists * 1.1 +
-            headers * 0.8
-        )
+        return Counter(category for _, category in self.iter_keyword_elements(content, _lower_for_matching(content)))
+
+    def iter_keyword_elements(self, content: str, content_lower: Optional[str]) -> Iterator[Tuple[int, str]]:
+        """Yield the start offset in the scanned content and category of every procedural and UI interaction element"""
+        
+        # The automaton matches lowercased keywords, which disagrees with case-insensitive
+        # matching on İ, ı and ſ, so content containing them takes the union patterns
+        if _KEYWORD_AUTOMATON is not None and content_lower is not None:
+            yield from self.iter_keywords(content_lower)
+            for match in _INDENTED_LINE_RE.finditer(content_lower):
+                yield match.start(), 'indented_lines'
+            return
+        
+        # Content that lower() cannot stand in for is scanned as is with the case-insensitive unions
+        if content_lower is None:
+            scanned_content = content
+            procedural_pattern, ui_pattern = _PROCEDURAL_ELEMENTS_FOLDING_RE, _UI_INTERACTION_FOLDING_RE
+        else:
+            scanned_content = content_lower
+            procedural_pattern, ui_pattern = _PROCEDURAL_ELEMENTS_RE, _UI_INTERACTION_RE
         
-        # Normalize by content length
-        word_count = len(content.split())
-        if word_count > 0:
-            quality_score = (quality_score / word_count) * 100
+        for match in procedural_pattern.finditer(scanned_content):
+            yield match.start(), match.lastgroup
         
-        return min(quality_score, 1.0)
+        for match in ui_pattern.finditer(scanned_content):
+            yield match.start(), match.lastgroup
+            
+            # Specific references embed plain UI words ("File menu"), which
+            # are counted in their own category as well
+            if match.lastgroup == 'specific_ui':
+                for word in match.group().lower().split():
+                    if word in _UI_ACTION_WORDS:
+                        yield match.start(), 'ui_actions'
+                    elif word in _UI_ELEMENT_WORDS:
+                        yield match.start(), 'ui_elements'
 
-    def calculate_procedural_depth(self, content: str) -> float:
-        """Calculate the procedural depth and complexity"""
+    def iter_keywords(self, content_lower: str) -> Iterator[Tuple[int, str]]:
+        """Yield whole-word keyword hits of lowercased content from one Aho-Corasick pass"""
         
-        # Look for sequential indicators
-        sequential_words = len(re.findall(r'\b(?:first|second|third|next|then|finally|after|before)\b', content, re.IGNORECASE))
+        last_index = len(content_lower) - 1
         
-        # Look for conditional logic
-        conditional_words = len(re.findall(r'\b(?:if|when|unless|should|depending|based on)\b', content, re.IGNORECASE))
+        for end, (category, length) in _KEYWORD_AUTOMATON.iter(content_lower):
+            start = end - length + 1
+            
+            # Enforce the same word boundaries as the \b-delimited patterns
+            if start > 0 and (content_lower[start - 1].isalnum() or content_lower[start - 1] == '_'):
+                continue
+            if end < last_index and (content_lower[end + 1].isalnum() or content_lower[end + 1] == '_'):
+                continue
+            
+            yield start, category
+
+    def calculate_structural_quality(self, content: str, word_count: int = None) -> float:
+        """Calculate the structural quality of content"""
         
-        # Look for hierarchical structure
-        indented_lines = len(re.findall(r'^\s{4,}[^\s]', content, re.MULTILINE))
+        if word_count is None:
+            word_count = len(content.split())
         
-        # Calculate depth score
-        depth_score = (
-            sequential_words * 0.5 +
-            conditional_words * 0.7 +
-            indented_lines * 0.3
-        )
+        return self.element_scores_from_counts(self.count_structural_elements(content), Counter(), word_count)[0]
+
+    def calculate_procedural_depth(self, content: str, word_count: int = None) -> float:
+        """Calculate the procedural depth and complexity"""
         
-        # Normalize by content length
-        word_count = len(content.split())
-        if word_count > 0:
-            depth_score = (depth_score / word_count) * 100
+        if word_count is None:
+            word_count = len(content.split())
         
-        return min(depth_score, 1.0)
+        return self.element_scores_from_counts(Counter(), self.count_keyword_elements(content), word_count)[1]
 
-    def calculate_ui_interaction_level(self, content: str) -> float:
+    def calculate_ui_interaction_level(self, content: str, word_count: int = None) -> float:
         """Calculate the level of UI interaction described"""
         
-        # UI action verbs
-        ui_actions = len(re.findall(r'\b(?:click|select|choose|press|drag|drop|type|enter|hover|scroll)\b', content, re.IGNORECASE))
-        
-        # UI elements
-        ui_elements = len(re.findall(r'\b(?:button|menu|toolbar|panel|dialog|window|field|checkbox|dropdown|tab)\b', content, re.IGNORECASE))
+        if word_count is None:
+            word_count = len(content.split())
         
-        # Specific UI references
-        specific_ui = len(re.findall(r'\b(?:All tools|File menu|Edit menu|View menu|Properties panel)\b', content, re.IGNORECASE))
+        return self.element_scores_from_counts(Counter(), self.count_keyword_elements(content), word_count)[2]
+
+    def element_scores_from_counts(self, structural_counts: Counter, keyword_counts: Counter, word_count: int) -> Tuple[float, float, float]:
+        """Calculate the structural quality, procedural depth and UI interaction scores from precomputed element counts"""
         
-        # Calculate UI score
+        # Calculate quality, depth and UI scores
+        quality_score = (
+            structural_counts['numbered_lists'] * 1.2 +
+            structural_counts['bullet_points'] * 1.0 +
+            structural_counts['sub_lists'] * 1.1 +
+            structural_counts['headers'] * 0.8
+        )
+        depth_score = (
+            keyword_counts['sequential_words'] * 0.5 +
+            keyword_counts['conditional_words'] * 0.7 +
+            keyword_counts['indented_lines'] * 0.3
+        )
         ui_score = (
-            ui_actions * 1.0 +
-            ui_elements * 0.8 +
-            specific_ui * 1.2
+            keyword_counts['ui_actions'] * 1.0 +
+            keyword_counts['ui_elements'] * 0.8 +
+            keyword_counts['specific_ui'] * 1.2
         )
         
         # Normalize by content length
-        word_count = len(content.split())
         if word_count > 0:
+            quality_score = (quality_score / word_count) * 100
+            depth_score = (depth_score / word_count) * 100
             ui_score = (ui_score / word_count) * 100
         
-        return min(ui_score, 1.0)
+        return min(quality_score, 1.0), min(depth_score, 1.0), min(ui_score, 1.0)
+
+    def read_documents(self, pdf_paths: List[str]) -> List[Tuple[str, List[str]]]:
+        """Extract the page texts of all documents in a pool of worker processes"""
+        
+        if not pdf_paths:
+            return []
+        
+        max_workers = min(os.cpu_count() or 1, len(pdf_paths))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            all_page_texts = list(executor.map(_extract_all_pages, pdf_paths))
+        
+        return [(os.path.basename(pdf_path), page_texts) for pdf_path, page_texts in zip(pdf_paths, all_page_texts)]
 
     def extract_enhanced_sections(self, pdf_paths: List[str], persona: str, job: str) -> List[Dict[str, Any]]:
         """Extract sections with enhanced persona-job matching"""
         
+        documents = self.read_documents(pdf_paths)
+        
+        return self.extract_enhanced_sections_from_cached(documents, persona, job)
+
+    def extract_enhanced_sections_from_cached(self, documents: List[Tuple[str, List[str]]], persona: str, job: str) -> List[Dict[str, Any]]:
+        """Extract sections with enhanced persona-job matching from already extracted page texts"""
+        
         all_sections = []
         
-        for pdf_path in pdf_paths:
-            try:
-                with open(pdf_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    document_name = os.path.basename(pdf_path)
-                    
-                    for page_num, page in enumerate(pdf_reader.pages, 1):
-                        page_text = page.extract_text()
-                        page_sections = self.extract_sections_from_page_enhanced(
-                            page_text, page_num, document_name, persona, job
-                        )
-                        all_sections.extend(page_sections)
-            
-            except Exception as e:
-                print(f"Error processing {pdf_path}: {e}")
-                continue
+        for document_name, page_texts in documents:
+            for page_num, page_text in enumerate(page_texts, 1):
+                page_sections = self.extract_sections_from_page_enhanced(
+                    page_text, page_num, document_name, persona, job
+                )
+                all_sections.extend(page_sections)
         
         # Sort by relevance score
         all_sections.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
@@ -338,24 +588,37 @@ class AutoAdaptiveDocumentAnalyzer:
         if len(lines) < 5:
             return sections
         
+        job_config = self.job_configs.get((persona, job))
+        if job_config is None:
+            return sections
+        
         # Use sliding window approach
         window_size = 12
         step_size = 6
-        
-        for i in range(0, len(lines) - window_size + 1, step_size):
-            window_lines = lines[i:i + window_size]
-            content_text = '\n'.join(window_lines)
-            
-            # Calculate enhanced relevance score
-            relevance_score = self.calculate_enhanced_relevance_score(content_text, persona, job)
-            
-            if relevance_score > 0.3:  # Threshold for inclusion
+        relevance_threshold = 0.3
+        window_starts = range(0, len(lines) - window_size + 1, step_size)
+        window_contents = ['\n'.join(lines[i:i + window_size]) for i in window_starts]
+        
+        # Gather the match counts of every window first, then score them in one batch;
+        # windows that cannot pass the threshold come back as None
+        window_features = self.count_sliding_window_features(
+            lines, window_starts, window_contents, window_size, job_config, relevance_threshold
+        )
+        relevance_scores = [
+            self.score_window_features(features, job_config) if features is not None else 0.0
+            for features in window_features
+        ]
+        
+        for i, content_text, features, relevance_score in zip(window_starts, window_contents, window_features, relevance_scores):
+            if relevance_score > relevance_threshold:  # Threshold for inclusion
+                window_lines = lines[i:i + window_size]
                 section = {
                     'content': content_text,
                     'lines': window_lines,
                     'page_number': page_num,
                     'document': document_name,
-                    'word_count': len(content_text.split()),
+                    'word_count': features['word_count'],
+                    'word_set': frozenset(content_text.lower().split()),
                     'relevance_score': relevance_score,
                     'title': self.generate_enhanced_title(window_lines, persona, job)
                 }
@@ -366,28 +629,143 @@ class AutoAdaptiveDocumentAnalyzer:
         
         return merged_sections
 
-    def calculate_enhanced_relevance_score(self, content: str, persona: str, job: str) -> float:
+    def calculate_enhanced_relevance_score(self, content: str, persona: str, job: str, word_count: int = None) -> float:
         """Calculate enhanced relevance score for persona-job combination"""
         
         # Get the persona-job configuration
-        if persona not in self.persona_job_matrix or job not in self.persona_job_matrix[persona]:
+        job_config = self.job_configs.get((persona, job))
+        if job_config is None:
             return 0.0
         
-        job_config = self.persona_job_matrix[persona][job]
+        return self.score_window_features(self.count_window_features(content, job_config, word_count), job_config)
+
+    def count_window_features(self, content: str, job_config: Dict[str, Any], word_count: int = None, lines: List[str] = None) -> Dict[str, Any]:
+        """Collect the pattern and structural element counts used for relevance scoring"""
+        
+        if word_count is None:
+            word_count = len(content.split())
+        
+        if lines is None:
+            lines = content.split('\n')
+        
+        # Lowercase once so the keyword and pattern scans can skip case folding
+        content_lower = _lower_for_matching(content)
+        scanned_content = content if content_lower is None else content_lower
+        keyword_counts = Counter(category for _, category in self.iter_keyword_elements(content, content_lower))
+        
+        pattern_matches = 0
+        for pattern, word_weights in self.select_unanchored_patterns(content_lower, job_config):
+            if word_weights is None:
+                pattern_matches += len(pattern.findall(scanned_content))
+            else:
+                pattern_matches += sum(word_weights[word] for word in pattern.findall(scanned_content))
+        pattern_matches += self.count_numbered_step_matches(content, lines, job_config['numbered_step_patterns'])
+        
+        return {
+            'pattern_matches': pattern_matches,
+            'structural': self.count_structural_elements(content),
+            'keywords': keyword_counts,
+            'word_count': word_count
+        }
+
+    def count_sliding_window_features(self, lines: List[str], window_starts: range, window_contents: List[str], window_size: int, job_config: Dict[str, Any], min_score: float = None) -> List[Dict[str, Any]]:
+        """Collect the relevance scoring counts of every sliding window over the lines of a page"""
+        
+        # Keyword and unanchored pattern matches never cross a line break, so the
+        # page is scanned once and each match is attributed to its line
+        page = '\n'.join(lines)
+        page_lower = _lower_for_matching(page)
+        scanned_page = page if page_lower is None else page_lower
+        line_starts = [0, *accumulate(len(line) + 1 for line in scanned_page.split('\n'))]
+        line_counts = defaultdict(lambda: [0] * len(lines))
+        
+        for start, category in self.iter_keyword_elements(page, page_lower):
+            line_counts[category][bisect_right(line_starts, start) - 1] += 1
+        
+        for pattern, word_weights in self.select_unanchored_patterns(page_lower, job_config):
+            for match in pattern.finditer(scanned_page):
+                weight = word_weights[match.group()] if word_weights is not None else 1
+                line_counts['pattern_matches'][bisect_right(line_starts, match.start()) - 1] += weight
+        
+        line_counts['word_count'] = [len(line.split()) for line in lines]
+        
+        # Window totals are differences of the cumulative per-line counts
+        cumulative_counts = {category: [0, *accumulate(counts)] for category, counts in line_counts.items()}
+        window_features = []
+        
+        for i, content_text in zip(window_starts, window_contents):
+            window_counts = {
+                category: cumulative[i + window_size] - cumulative[i]
+                for category, cumulative in cumulative_counts.items()
+            }
+            
+            # Structural elements and numbered steps can span lines, so they are counted per window
+            pattern_matches = window_counts.pop('pattern_matches', 0)
+            pattern_matches += self.count_numbered_step_matches(content_text, lines[i:i + window_size], job_config['numbered_step_patterns'])
+            word_count = window_counts.pop('word_count')
+            keyword_counts = Counter(window_counts)
+            
+            features = {
+                'pattern_matches': pattern_matches,
+                'structural': None,
+                'keywords': keyword_counts,
+                'word_count': word_count
+            }
+            
+            # Structural quality is capped at 1.0, so a window that stays at or below
+            # min_score even with a perfect structure can skip the structural scan
+            if min_score is not None and self.score_window_features(features, job_config, structural_score=1.0) <= min_score:
+                window_features.append(None)
+                continue
+            
+            features['structural'] = self.count_structural_elements(content_text)
+            window_features.append(features)
+        
+        return window_features
+
+    def select_unanchored_patterns(self, content_lower: Optional[str], job_config: Dict[str, Any]) -> List[Tuple[Any, Counter]]:
+        """Pick the RE2 patterns when they are available and agree with stdlib re on the content"""
+        
+        # Content that lower() cannot stand in for is scanned with the case-insensitive patterns
+        if content_lower is None:
+            return job_config['case_insensitive_patterns']
+        
+        if job_config['re2_patterns'] is not None and (content_lower.isascii() or not _NON_ASCII_WORD_RE.search(content_lower)):
+            return job_config['re2_patterns']
+        
+        return job_config['unanchored_patterns']
+
+    def count_numbered_step_matches(self, content: str, lines: List[str], patterns: List[Any]) -> int:
+        """Count numbered step matches by trying each pattern only at lines starting with a digit"""
+        
+        if not patterns:
+            return 0
+        
+        matches = 0
+        offset = 0
+        
+        for line in lines:
+            # Step matches can only cover a line whose first non-blank character is a digit
+            if line.lstrip()[:1].isdigit():
+                matches += sum(1 for pattern in patterns if pattern.match(content, offset))
+            offset += len(line) + 1
         
-        # Calculate pattern match score
-        pattern_score = 0.0
-        for pattern in job_config['required_patterns']:
-            matches = len(re.findall(pattern, content, re.IGNORECASE | re.MULTILINE))
-            pattern_score += matches
+        return matches
+
+    def score_window_features(self, features: Dict[str, Any], job_config: Dict[str, Any], structural_score: float = None) -> float:
+        """Combine precomputed window counts into the enhanced relevance score"""
+        
+        word_count = features['word_count']
         
-        # Apply structural weight
-        pattern_score *= job_config['structural_weight']
+        # Apply structural weight to the pattern match score
+        pattern_score = features['pattern_matches'] * job_config['structural_weight']
         
-        # Calculate other scores
-        structural_score = self.calculate_structural_quality(content)
-        procedural_score = self.calculate_procedural_depth(content)
-        ui_score = self.calculate_ui_interaction_level(content)
+        # Calculate other scores; a given structural score replaces the counted one
+        counted_structural_score, procedural_score, ui_score = self.element_scores_from_counts(
+            features['structural'] if features['structural'] is not None else Counter(), features['keywords'], word_count
+        )
+        if structural_score is None:
+            structural_score = counted_structural_score
         
         # Apply UI interaction weight
         ui_score *= job_config['ui_interaction_weight']
@@ -416,36 +794,37 @@ class AutoAdaptiveDocumentAnalyzer:
                 continue
             
             score = 0
+            line_lower = line_clean.lower()
             
             # Score based on persona-job relevance
             if persona == 'hr_professional' and job == 'create_manage_forms':
-                if re.search(r'\b(?:form|field|fillable|signature|workflow)\b', line_clean, re.IGNORECASE):
+                if _mentions_any(line_clean, line_lower, _TITLE_FORM_WORDS, _TITLE_FORM_RE):
                     score += 3
-                if re.search(r'\b(?:create|prepare|design|manage)\b', line_clean, re.IGNORECASE):
+                if _mentions_any(line_clean, line_lower, _TITLE_FORM_ACTION_WORDS, _TITLE_FORM_ACTION_RE):
                     score += 2
             
             elif persona == 'business_professional' and job == 'document_collaboration':
-                if re.search(r'\b(?:share|collaborate|review|comment|approve)\b', line_clean, re.IGNORECASE):
+                if _mentions_any(line_clean, line_lower, _TITLE_COLLABORATION_WORDS, _TITLE_COLLABORATION_RE):
                     score += 3
-                if re.search(r'\b(?:team|group|workflow|process)\b', line_clean, re.IGNORECASE):
+                if _mentions_any(line_clean, line_lower, _TITLE_TEAM_WORDS, _TITLE_TEAM_RE):
                     score += 2
             
             elif job == 'content_production':
-                if re.search(r'\b(?:create|convert|generate|export|produce)\b', line_clean, re.IGNORECASE):
+                if _mentions_any(line_clean, line_lower, _TITLE_PRODUCTION_WORDS, _TITLE_PRODUCTION_RE):
                     score += 3
-                if re.search(r'\b(?:document|PDF|file|content)\b', line_clean, re.IGNORECASE):
+                if _mentions_any(line_clean, line_lower, _TITLE_DOCUMENT_WORDS, _TITLE_DOCUMENT_RE):
                     score += 2
             
             # General scoring
-            if re.search(r'\b(?:Adobe|Acrobat|PDF)\b', line_clean, re.IGNORECASE):
+            if _mentions_any(line_clean, line_lower, _TITLE_PRODUCT_WORDS, _TITLE_PRODUCT_RE):
                 score += 1
             
             # Prefer lines that look like headers or instructions
-            if re.match(r'^[A-Z]', line_clean) and not re.match(r'^\d+\.', line_clean):
+            if _TITLE_CAPITALIZED_RE.match(line_clean) and not _TITLE_NUMBERED_RE.match(line_clean):
                 score += 1
             
             # Avoid generic selections
-            if line_clean.lower().startswith(('select', 'click', 'choose')) and len(line_clean) < 30:
+            if line_lower.startswith(('select', 'click', 'choose')) and len(line_clean) < 30:
                 score -= 2
             
             if score > best_score:
@@ -454,8 +833,8 @@ class AutoAdaptiveDocumentAnalyzer:
         
         if best_title:
             # Clean up the title
-            best_title = re.sub(r'^\d+[\.\)]\s*', '', best_title)
-            best_title = re.sub(r'^[•\-\*\+]\s*', '', best_title)
+            best_title = _TITLE_NUMBER_PREFIX_RE.sub('', best_title)
+            best_title = _TITLE_BULLET_PREFIX_RE.sub('', best_title)
             
             if len(best_title) > 80:
                 best_title = best_title[:77] + "..."
@@ -485,10 +864,19 @@ class AutoAdaptiveDocumentAnalyzer:
         for section in sorted_sections:
             # Check if this section overlaps significantly with any existing merged section
             is_duplicate = False
+            section_size = len(section['word_set'])
             
             for existing in merged:
-                # Simple overlap check based on content similarity
-                overlap_ratio = self.calculate_content_overlap(section['content'], existing['content'])
+                # The overlap ratio can never exceed the ratio of the word set
+                # sizes, so sections of very different length are skipped cheaply
+                existing_size = len(existing['word_set'])
+                if not section_size or not existing_size:
+                    continue
+                if min(section_size, existing_size) / max(section_size, existing_size) <= 0.6:
+                    continue
+                
+                # Simple overlap check based on the precomputed word sets
+                overlap_ratio = self.calculate_content_overlap(section['word_set'], existing['word_set'])
                 if overlap_ratio > 0.6:  # 60% overlap threshold
                     is_duplicate = True
                     break
@@ -502,19 +890,17 @@ class AutoAdaptiveDocumentAnalyzer:
         
         return merged
 
-    def calculate_content_overlap(self, content1: str, content2: str) -> float:
-        """Calculate content overlap ratio between two text blocks"""
-        
-        words1 = set(content1.lower().split())
-        words2 = set(content2.lower().split())
+    def calculate_content_overlap(self, words1: frozenset, words2: frozenset) -> float:
+        """Calculate content overlap ratio between the word sets of two text blocks"""
         
         if not words1 or not words2:
             return 0.0
         
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
+        # Derive the union size from the intersection instead of building it
+        intersection_size = len(words1.intersection(words2))
+        union_size = len(words1) + len(words2) - intersection_size
         
-        return len(intersection) / len(union) if union else 0.0
+        return intersection_size / union_size if union_size else 0.0
 
     def ensure_document_diversity_enhanced(self, sections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Ensure diverse representation across documents"""
@@ -544,27 +930,22 @@ class AutoAdaptiveDocumentAnalyzer:
         print("🤖 Starting Auto-Adaptive Document Analysis")
         print("=" * 60)
         
-        # Read all content for analysis
-        all_content = ""
-        for pdf_path in pdf_paths:
-            try:
-                with open(pdf_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    for page in pdf_reader.pages:
-                        all_content += page.extract_text() + "\n"
-            except Exception as e:
-                print(f"Error reading {pdf_path}: {e}")
-                continue
+        # Read all content once; the page texts are reused for section extraction
+        documents = self.read_documents(pdf_paths)
+        all_content = "".join(page_text + "\n" for _, page_texts in documents for page_text in page_texts)
+        
+        # Count words page by page so the combined text is never split into one huge list
+        total_words = sum(len(page_text.split()) for _, page_texts in documents for page_text in page_texts)
         
-        print(f"📚 Analyzed {len(all_content.split())} words across {len(pdf_paths)} documents")
+        print(f"📚 Analyzed {total_words} words across {len(pdf_paths)} documents")
         
         # Auto-detect document type
-        document_type = self.auto_detect_document_type(all_content)
+        document_type = self.auto_detect_document_type(all_content, total_words)
         print(f"🔍 Detected document type: {document_type}")
         
         # Auto-select optimal persona-job combination
         if not input_persona or not input_job:
-            optimal_persona, optimal_job = self.auto_select_optimal_persona_job(document_type, all_content)
+            optimal_persona, optimal_job = self.auto_select_optimal_persona_job(document_type, all_content, total_words)
             effective_persona = input_persona if input_persona else optimal_persona
             effective_job = input_job if input_job else optimal_job
             
@@ -576,9 +957,12 @@ class AutoAdaptiveDocumentAnalyzer:
             print(f"👤 Using provided persona: {effective_persona}")
             print(f"💼 Using provided job: {effective_job}")
         
+        # The combined text is only needed for detection and selection
+        del all_content
+        
         # Extract sections with enhanced matching
         print(f"\n🚀 Extracting sections with enhanced {effective_persona} + {effective_job} matching...")
-        enhanced_sections = self.extract_enhanced_sections(pdf_paths, effective_persona, effective_job)
+        enhanced_sections = self.extract_enhanced_sections_from_cached(documents, effective_persona, effective_job)
         
         print(f"✅ Extracted {len(enhanced_sections)} relevant sections")
         
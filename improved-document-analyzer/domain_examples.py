@@ -4,143 +4,190 @@
 Examples showing how the structural analyzer works across different domains
 """
 
-def demonstrate_cross_domain_compatibility():
-    """Show how the same analyzer works across different document types"""
+import sys
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Mapping, Tuple
+
+# Example test cases across different domains, built once at import together
+# with their preformatted structure lists and lowercase labels
+_TEST_CASES = tuple(MappingProxyType({
+    **case,
+    'expected_structures_text': ', '.join(case['expected_structures']),
+    'domain_lower': case['domain'].lower(),
+    'persona_lower': case['persona'].lower()
+}) for case in (
+    # Academic Research Domain
+    {
+        'domain': 'Academic Research',
+        'documents': ('research_paper_1.pdf', 'research_paper_2.pdf', 'literature_review.pdf'),
+        'persona': 'PhD Researcher in Computational Biology',
+        'job': 'Prepare a comprehensive literature review focusing on methodologies and benchmarks',
+        'expected_structures': ('numbered_lists', 'key_value_pairs', 'measurements', 'headers')
+    },
+
+    # Business Analysis Domain  
+    {
+        'domain': 'Business Analysis',
+        'documents': ('annual_report_2022.pdf', 'annual_report_2023.pdf', 'market_analysis.pdf'),
+        'persona': 'Investment Analyst',
+        'job': 'Analyze revenue trends, R&D investments, and market positioning strategies',
+        'expected_structures': ('measurements', 'prices', 'key_value_pairs', 'emphasis')
+    },
+
+    # Educational Content Domain
+    {
+        'domain': 'Educational Content',
+        'documents': ('chemistry_ch1.pdf', 'chemistry_ch2.pdf', 'organic_reactions.pdf'),
+        'persona': 'Undergraduate Chemistry Student', 
+        'job': 'Identify key concepts and mechanisms for exam preparation on reaction kinetics',
+        'expected_structures': ('numbered_lists', 'bullet_points', 'headers', 'emphasis')
+    },
+
+    # Travel Planning Domain (your current case)
+    {
+        'domain': 'Travel Planning',
+        'documents': ('south_france_cities.pdf', 'activities_guide.pdf', 'restaurants.pdf'),
+        'persona': 'Travel Planner',
+        'job': 'Plan a trip of 4 days for a group of 10 college friends',
+        'expected_structures': ('locations', 'prices', 'contact_info', 'time_references')
+    },
+
+    # Technical Documentation Domain
+    {
+        'domain': 'Technical Documentation',
+        'documents': ('installation_guide.pdf', 'api_reference.pdf', 'troubleshooting.pdf'),
+        'persona': 'Software Developer',
+        'job': 'Set up and configure the system for production deployment',
+        'expected_structures': ('numbered_lists', 'bullet_points', 'key_value_pairs', 'headers')
+    },
+
+    # Legal Documents Domain
+    {
+        'domain': 'Legal Documents',
+        'documents': ('contract_template.pdf', 'legal_precedents.pdf', 'regulations.pdf'),
+        'persona': 'Legal Researcher',
+        'job': 'Find relevant clauses and precedents for contract negotiation',
+        'expected_structures': ('numbered_lists', 'headers', 'key_value_pairs', 'emphasis')
+    },
+
+    # Medical Research Domain
+    {
+        'domain': 'Medical Research',
+        'documents': ('clinical_trial_1.pdf', 'medical_guidelines.pdf', 'drug_analysis.pdf'),
+        'persona': 'Medical Researcher',
+        'job': 'Review clinical trial results and treatment protocols',
+        'expected_structures': ('measurements', 'numbered_lists', 'key_value_pairs', 'headers')
+    },
+
+    # Financial Reports Domain
+    {
+        'domain': 'Financial Reports',
+        'documents': ('quarterly_report.pdf', 'budget_analysis.pdf', 'financial_statements.pdf'),
+        'persona': 'Financial Analyst',
+        'job': 'Analyze financial performance and identify investment opportunities',
+        'expected_structures': ('prices', 'measurements', 'key_value_pairs', 'emphasis')
+    }
+))
+
+# Common structures and an example for each document family
+_UNIVERSAL_PATTERNS = tuple((domain, MappingProxyType({
+    **info,
+    'common_structures_text': ', '.join(info['common_structures'])
+})) for domain, info in {
+    'Academic Papers': {
+        'common_structures': ('numbered_lists', 'key_value_pairs', 'measurements', 'headers'),
+        'example': 'Abstract, Introduction, Methods (1. Data Collection, 2. Analysis), Results (Table 1: Performance metrics), Conclusion'
+    },
+    'Business Reports': {
+        'common_structures': ('measurements', 'prices', 'key_value_pairs', 'emphasis'),
+        'example': 'Executive Summary, Revenue: $2.5M (+15%), Key Metrics, Market Analysis, Recommendations'
+    },
+    'Travel Guides': {
+        'common_structures': ('locations', 'prices', 'contact_info', 'bullet_points'),
+        'example': 'Nice: Promenade des Anglais, Hotels: €80-150/night, Phone: +33..., Activities: • Beach • Museums'
+    },
+    'Technical Manuals': {
+        'common_structures': ('numbered_lists', 'bullet_points', 'key_value_pairs', 'headers'),
+        'example': 'Installation: 1. Download, 2. Configure, Requirements: Python 3.8+, Port: 8080'
+    },
+    'Legal Documents': {
+        'common_structures': ('numbered_lists', 'headers', 'key_value_pairs', 'emphasis'),
+        'example': 'Article 1: Definitions, Terms: Party A, Party B, Effective Date: January 1, 2024'
+    }
+}.items())
+
+def get_test_cases() -> Tuple[Mapping[str, Any], ...]:
+    """Return the read-only cross-domain test cases"""
     
-    # Example test cases across different domains
-    test_cases = [
-        # Academic Research Domain
-        {
-            'domain': 'Academic Research',
-            'documents': ['research_paper_1.pdf', 'research_paper_2.pdf', 'literature_review.pdf'],
-            'persona': 'PhD Researcher in Computational Biology',
-            'job': 'Prepare a comprehensive literature review focusing on methodologies and benchmarks',
-            'expected_structures': ['numbered_lists', 'key_value_pairs', 'measurements', 'headers']
-        },
-        
-        # Business Analysis Domain  
-        {
-            'domain': 'Business Analysis',
-            'documents': ['annual_report_2022.pdf', 'annual_report_2023.pdf', 'market_analysis.pdf'],
-            'persona': 'Investment Analyst',
-            'job': 'Analyze revenue trends, R&D investments, and market positioning strategies',
-            'expected_structures': ['measurements', 'prices', 'key_value_pairs', 'emphasis']
-        },
-        
-        # Educational Content Domain
-        {
-            'domain': 'Educational Content',
-            'documents': ['chemistry_ch1.pdf', 'chemistry_ch2.pdf', 'organic_reactions.pdf'],
-            'persona': 'Undergraduate Chemistry Student', 
-            'job': 'Identify key concepts and mechanisms for exam preparation on reaction kinetics',
-            'expected_structures': ['numbered_lists', 'bullet_points', 'headers', 'emphasis']
-        },
-        
-        # Travel Planning Domain (your current case)
-        {
-            'domain': 'Travel Planning',
-            'documents': ['south_france_cities.pdf', 'activities_guide.pdf', 'restaurants.pdf'],
-            'persona': 'Travel Planner',
-            'job': 'Plan a trip of 4 days for a group of 10 college friends',
-            'expected_structures': ['locations', 'prices', 'contact_info', 'time_references']
-        },
-        
-        # Technical Documentation Domain
-        {
-            'domain': 'Technical Documentation',
-            'documents': ['installation_guide.pdf', 'api_reference.pdf', 'troubleshooting.pdf'],
-            'persona': 'Software Developer',
-            'job': 'Set up and configure the system for production deployment',
-            'expected_structures': ['numbered_lists', 'bullet_points', 'key_value_pairs', 'headers']
-        },
-        
-        # Legal Documents Domain
-        {
-            'domain': 'Legal Documents',
-            'documents': ['contract_template.pdf', 'legal_precedents.pdf', 'regulations.pdf'],
-            'persona': 'Legal Researcher',
-            'job': 'Find relevant clauses and precedents for contract negotiation',
-            'expected_structures': ['numbered_lists', 'headers', 'key_value_pairs', 'emphasis']
-        },
-        
-        # Medical Research Domain
-        {
-            'domain': 'Medical Research',
-            'documents': ['clinical_trial_1.pdf', 'medical_guidelines.pdf', 'drug_analysis.pdf'],
-            'persona': 'Medical Researcher',
-            'job': 'Review clinical trial results and treatment protocols',
-            'expected_structures': ['measurements', 'numbered_lists', 'key_value_pairs', 'headers']
-        },
-        
-        # Financial Reports Domain
-        {
-            'domain': 'Financial Reports',
-            'documents': ['quarterly_report.pdf', 'budget_analysis.pdf', 'financial_statements.pdf'],
-            'persona': 'Financial Analyst',
-            'job': 'Analyze financial performance and identify investment opportunities',
-            'expected_structures': ['prices', 'measurements', 'key_value_pairs', 'emphasis']
-        }
-    ]
+    return _TEST_CASES
+
+def get_universal_patterns() -> Tuple[Tuple[str, Mapping[str, Any]], ...]:
+    """Return the read-only (domain, structures) pairs of the universality demo"""
+    
+    return _UNIVERSAL_PATTERNS
+
+# The reports depend only on the constant data above; they are formatted on
+# first use so that importers who only need the data pay nothing
+@lru_cache(maxsize=None)
+def _build_compatibility_report():
+    """Format the cross-domain compatibility report"""
     
-    print("🔍 Cross-Domain Compatibility Demonstration")
-    print("=" * 60)
+    lines = []
     
-    for i, case in enumerate(test_cases, 1):
-        print(f"\n{i}. {case['domain']} Domain")
-        print(f"   Persona: {case['persona']}")
-        print(f"   Job: {case['job']}")
-        print(f"   Expected Structures: {', '.join(case['expected_structures'])}")
-        print(f"   Documents: {len(case['documents'])} files")
+    lines.append("🔍 Cross-Domain Compatibility Demonstration")
+    lines.append("=" * 60)
+    
+    for i, case in enumerate(get_test_cases(), 1):
+        lines.append(f"\n{i}. {case['domain']} Domain")
+        lines.append(f"   Persona: {case['persona']}")
+        lines.append(f"   Job: {case['job']}")
+        lines.append(f"   Expected Structures: {case['expected_structures_text']}")
+        lines.append(f"   Documents: {len(case['documents'])} files")
         
         # Show how the analyzer would adapt
-        print(f"   ✅ Analyzer will automatically:")
-        print(f"      • Detect structural patterns in {case['domain'].lower()} documents")
-        print(f"      • Score sections based on {case['persona'].lower()} needs")
-        print(f"      • Prioritize content relevant to: {case['job']}")
+        lines.append(f"   ✅ Analyzer will automatically:")
+        lines.append(f"      • Detect structural patterns in {case['domain_lower']} documents")
+        lines.append(f"      • Score sections based on {case['persona_lower']} needs")
+        lines.append(f"      • Prioritize content relevant to: {case['job']}")
+    
+    lines.append(f"\n" + "=" * 60)
+    lines.append("✅ The structural analyzer works across ALL domains because:")
+    lines.append("   • It analyzes document STRUCTURE, not domain-specific keywords")
+    lines.append("   • Structural patterns are universal (lists, headers, data, etc.)")
+    lines.append("   • Persona-job matching is based on information organization")
+    lines.append("   • No domain-specific training or configuration required")
     
-    print(f"\n" + "=" * 60)
-    print("✅ The structural analyzer works across ALL domains because:")
-    print("   • It analyzes document STRUCTURE, not domain-specific keywords")
-    print("   • Structural patterns are universal (lists, headers, data, etc.)")
-    print("   • Persona-job matching is based on information organization")
-    print("   • No domain-specific training or configuration required")
+    return "\n".join(lines) + "\n"
 
-def show_structural_universality():
-    """Demonstrate how structural patterns are universal across domains"""
+@lru_cache(maxsize=None)
+def _build_universality_report():
+    """Format the universal structural patterns report"""
     
-    universal_patterns = {
-        'Academic Papers': {
-            'common_structures': ['numbered_lists', 'key_value_pairs', 'measurements', 'headers'],
-            'example': 'Abstract, Introduction, Methods (1. Data Collection, 2. Analysis), Results (Table 1: Performance metrics), Conclusion'
-        },
-        'Business Reports': {
-            'common_structures': ['measurements', 'prices', 'key_value_pairs', 'emphasis'],
-            'example': 'Executive Summary, Revenue: $2.5M (+15%), Key Metrics, Market Analysis, Recommendations'
-        },
-        'Travel Guides': {
-            'common_structures': ['locations', 'prices', 'contact_info', 'bullet_points'],
-            'example': 'Nice: Promenade des Anglais, Hotels: €80-150/night, Phone: +33..., Activities: • Beach • Museums'
-        },
-        'Technical Manuals': {
-            'common_structures': ['numbered_lists', 'bullet_points', 'key_value_pairs', 'headers'],
-            'example': 'Installation: 1. Download, 2. Configure, Requirements: Python 3.8+, Port: 8080'
-        },
-        'Legal Documents': {
-            'common_structures': ['numbered_lists', 'headers', 'key_value_pairs', 'emphasis'],
-            'example': 'Article 1: Definitions, Terms: Party A, Party B, Effective Date: January 1, 2024'
-        }
-    }
+    lines = []
     
-    print("\n🏗️  Universal Structural Patterns")
-    print("=" * 50)
+    lines.append("\n🏗️  Universal Structural Patterns")
+    lines.append("=" * 50)
     
-    for domain, info in universal_patterns.items():
-        print(f"\n{domain}:")
-        print(f"  Structures: {', '.join(info['common_structures'])}")
-        print(f"  Example: {info['example']}")
+    for domain, info in get_universal_patterns():
+        lines.append(f"\n{domain}:")
+        lines.append(f"  Structures: {info['common_structures_text']}")
+        lines.append(f"  Example: {info['example']}")
+    
+    lines.append(f"\n✅ Same structural elements appear across ALL domains!")
+    lines.append("   The analyzer detects these patterns regardless of content topic.")
+    
+    return "\n".join(lines) + "\n"
+
+def demonstrate_cross_domain_compatibility():
+    """Show how the same analyzer works across different document types"""
+    
+    sys.stdout.write(_build_compatibility_report())
+
+def show_structural_universality():
+    """Demonstrate how structural patterns are universal across domains"""
     
-    print(f"\n✅ Same structural elements appear across ALL domains!")
-    print("   The analyzer detects these patterns regardless of content topic.")
+    sys.stdout.write(_build_universality_report())
 
 if __name__ == "__main__":
     demonstrate_cross_domain_compatibility()
@@ -2,14 +2,254 @@ import json
 import os
 import re
 from datetime import datetime
-from typing import List, Dict, Any, Tuple, Set
-import PyPDF2
+from typing import List, Dict, Any, Tuple, Set, Iterable, Optional
 import argparse
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, islice
+import heapq
 import math
 
 # Import the enhanced signatures
 from enhanced_structural_signatures import EnhancedStructuralSignatures
+from pdf_text import open_page_texts
+from text_matching import CASE_FOLD_EXCEPTION_RE, RE2_MISMATCH_CHAR_RE, is_word_char
+
+# Optional Aho-Corasick automaton that scans for every indicator in a single
+# pass; the compiled indicator patterns are used when pyahocorasick is not installed
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Optional RE2 engine for the numeric density patterns; stdlib re is used when
+# google-re2 is not installed
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# Fewest words a content block can have
+_MIN_BLOCK_WORDS = 40
+
+# Contextual relevance patterns, matched against lowercased block content
+_NUMBERED_STEP_RE = re.compile(r'^\s*\d+\.\s+', re.MULTILINE)
+_BULLET_POINT_RE = re.compile(r'^\s*[•\-\*]\s+', re.MULTILINE)
+_BULLET_MARKERS = ('•', '-', '*')
+_UI_REFERENCE_RE = re.compile(r'\b(?:select|click|choose|press|drag|type|enter)\b')
+_WORKFLOW_INDICATOR_RE = re.compile(r'\b(?:then|next|after|before|once|when|if)\b')
+
+# Information density patterns
+_QUANTITY_RE = re.compile(r'\b\d+(?:\.\d+)?\s*(?:€|$|£|%|km|miles|hours?)\b')
+_CLOCK_TIME_RE = re.compile(r'\b\d{1,2}:\d{2}(?:\s*[ap]m)?\b')
+_WEB_REFERENCE_RE = re.compile(r'\b(?:www\.|http|@[\w.-]+)\b')
+_CAPITALIZED_BULLET_RE = re.compile(r'^\s*[•\-\*]\s+[A-Z]', re.MULTILINE)
+
+# RE2 scans the numeric patterns several times faster, but differs from re on content
+# with a RE2_MISMATCH_CHAR_RE character, and its $ does not match before a trailing newline
+_NUMERIC_DENSITY_RES = (_QUANTITY_RE, _CLOCK_TIME_RE, _WEB_REFERENCE_RE)
+_NUMERIC_DENSITY_RE2S = tuple(re2.compile(pattern.pattern) for pattern in _NUMERIC_DENSITY_RES) if re2 is not None else None
+
+# Named places are runs of capitalized words ending in a place type. Retrying the run
+# from every word makes the single pattern quadratic in the run length, so each maximal
+# run is found once and then checked for a place type after its first word
+_PLACE_TYPES = ('Street', 'Hotel', 'Restaurant', 'Museum')
+_CAPITALIZED_RUN_RE = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*')
+_PLACE_TYPE_WORD_RE = re.compile(r'\s(?:' + '|'.join(_PLACE_TYPES) + r')\b')
+
+# Title generation patterns
+# Capitalized words and numbers share one scan: a capitalized word is captured and a
+# number captures an empty string. Neither can start inside the other, so the scan
+# finds the same words and numbers as two separate ones
+_TITLE_WORD_OR_NUMBER_RE = re.compile(r'\b(?:([A-Z][a-z]+)|\d+(?:\.\d+)?)\b')
+_TITLE_LIST_MARKERS = '•-*+.)'
+_TITLE_NUMBER_PREFIX_RE = re.compile(r'^\d+[\.\)]\s*')
+_TITLE_BULLET_MARKERS = ('•', '-', '*', '+')
+_TITLE_BULLET_PREFIX_RE = re.compile(r'^[•\-\*\+]\s*')
+
+# Fallback titles based on content type
+_FALLBACK_TITLES = {
+    'procedural': 'Step-by-Step Instructions',
+    'informational': 'Information Summary',
+    'reference': 'Reference Information',
+    'general': 'Content Section'
+}
+
+# Indicators that are a plain alternation of whole words or phrases
+_WHOLE_WORD_INDICATOR_RE = re.compile(r'\\b\(\?:([\w |]+)\)\\b')
+
+# Indicators that match a line where a word starting one alternation is followed by
+# a word ending the other
+_SPAN_INDICATOR_RE = re.compile(r'\\b\(\?:([\w |]+)\)\.\*\(\?:([\w |]+)\)\\b')
+
+# Roles of an automaton word within an indicator
+_WHOLE_WORD, _SPAN_START, _SPAN_END = range(3)
+
+def _numeric_density_patterns(content: str) -> Tuple[Any, ...]:
+    """Pick the RE2 numeric density patterns when they agree with stdlib re on the content"""
+    if _NUMERIC_DENSITY_RE2S is not None and not content.endswith('\n') and not RE2_MISMATCH_CHAR_RE.search(content):
+        return _NUMERIC_DENSITY_RE2S
+    return _NUMERIC_DENSITY_RES
+
+def _indicator_scans(indicators: List[str], flags: int) -> List[Tuple[re.Pattern, Tuple[int, ...]]]:
+    """Compile indicators into scans, fusing whole-word indicators into one union.
+    
+    Whole-word matches with disjoint vocabularies never overlap, so a union with one
+    group per indicator finds exactly the matches of the separate scans.
+    """
+    scans = []
+    fused_sources = []
+    fused_indices = []
+    fused_words = set()
+    for index, pattern in enumerate(indicators):
+        whole_word_match = _WHOLE_WORD_INDICATOR_RE.fullmatch(pattern)
+        words = set(re.split(r'[| ]', whole_word_match.group(1).lower())) if whole_word_match else None
+        if words and not words & fused_words:
+            fused_sources.append(f'({whole_word_match.group(1)})')
+            fused_indices.append(index)
+            fused_words |= words
+        else:
+            scans.append((re.compile(pattern, flags), (index,)))
+    
+    if len(fused_indices) == 1:
+        scans.append((re.compile(indicators[fused_indices[0]], flags), tuple(fused_indices)))
+    elif fused_indices:
+        scans.append((re.compile(r'\b(?:' + '|'.join(fused_sources) + r')\b', flags), tuple(fused_indices)))
+    
+    return scans
+
+def _build_indicator_automaton(indicators: List[str]):
+    """Build an Aho-Corasick automaton over the words of all indicators.
+    
+    Returns None when an indicator is neither a whole-word alternation nor a span
+    between two word alternations.
+    """
+    word_roles = defaultdict(list)
+    for indicator_id, pattern in enumerate(indicators):
+        whole_word_match = _WHOLE_WORD_INDICATOR_RE.fullmatch(pattern)
+        span_match = _SPAN_INDICATOR_RE.fullmatch(pattern)
+        if whole_word_match:
+            words = whole_word_match.group(1).lower().split('|')
+            parts = re.split(r'[| ]', whole_word_match.group(1).lower())
+            if len(parts) != len(set(parts)):
+                return None
+            for word in words:
+                word_roles[word].append((indicator_id, _WHOLE_WORD))
+        elif span_match:
+            for word in dict.fromkeys(span_match.group(1).lower().split('|')):
+                word_roles[word].append((indicator_id, _SPAN_START))
+            for word in dict.fromkeys(span_match.group(2).lower().split('|')):
+                word_roles[word].append((indicator_id, _SPAN_END))
+        else:
+            return None
+    
+    automaton = ahocorasick.Automaton()
+    for word, roles in word_roles.items():
+        automaton.add_word(word, (len(word), tuple(roles)))
+    automaton.add_word('\n', None)
+    automaton.make_automaton()
+    return automaton
+
+def _count_automaton_matches(automaton, indicator_count: int, content_lower: str) -> List[int]:
+    """Count the matches of every indicator from one pass of the automaton"""
+    counts = [0] * indicator_count
+    for _, indicator_id in _iter_automaton_matches(automaton, indicator_count, content_lower):
+        counts[indicator_id] += 1
+    return counts
+
+def _iter_automaton_matches(automaton, indicator_count: int, content_lower: str):
+    """Yield a (line, indicator id) pair for every indicator match, in one pass of the automaton.
+    
+    A span indicator matches at most once per line, since its greedy match runs to
+    the last end word of the line, so it counts the lines where a start word is
+    followed by an end word.
+    """
+    armed_line = [-1] * indicator_count
+    armed_end = [0] * indicator_count
+    matched_line = [-1] * indicator_count
+    
+    line = 0
+    content_length = len(content_lower)
+    for end_index, value in automaton.iter(content_lower):
+        if value is None:
+            line += 1
+            continue
+        
+        word_length, roles = value
+        start = end_index - word_length + 1
+        stop = end_index + 1
+        starts_word = start == 0 or not is_word_char(content_lower[start - 1])
+        ends_word = stop == content_length or not is_word_char(content_lower[stop])
+        
+        for indicator_id, role in roles:
+            if role == _WHOLE_WORD:
+                if starts_word and ends_word:
+                    yield line, indicator_id
+            elif role == _SPAN_START:
+                # Occurrences arrive in end order, so the first start word of a line ends earliest
+                if starts_word and armed_line[indicator_id] != line:
+                    armed_line[indicator_id] = line
+                    armed_end[indicator_id] = stop
+            elif (ends_word and armed_line[indicator_id] == line and matched_line[indicator_id] != line
+                  and start >= armed_end[indicator_id]):
+                matched_line[indicator_id] = line
+                yield line, indicator_id
+
+def _block_content_lower(block: Dict[str, Any]) -> str:
+    """Lowercased block content, computed once and cached on the block"""
+    content_lower = block.get('content_lower')
+    if content_lower is None:
+        content_lower = block['content_lower'] = block.get('content', '').lower()
+    return content_lower
+
+def _block_signature_features(signatures: EnhancedStructuralSignatures, block: Dict[str, Any]) -> Dict[str, Any]:
+    """Structural signature features of a block, computed once and cached on the block"""
+    features = block.get('signature_features')
+    if features is None:
+        features = block['signature_features'] = signatures.precompute_block_features([block], word_count=block.get('word_count'))
+    return features
+
+def _has_matches(pattern: re.Pattern, content: str, minimum: int) -> bool:
+    """Check for at least `minimum` matches, stopping the scan as soon as they are found"""
+    for match_count, _ in enumerate(pattern.finditer(content), 1):
+        if match_count >= minimum:
+            return True
+    return False
+
+def _count_named_places(content: str) -> int:
+    """Count capitalized word runs that end in a place type (e.g. 'Grand Hotel')"""
+    if not any(place_type in content for place_type in _PLACE_TYPES):
+        return 0
+    
+    # The endpos includes the character after the run for the closing word boundary
+    return sum(
+        1 for run in _CAPITALIZED_RUN_RE.finditer(content)
+        if _PLACE_TYPE_WORD_RE.search(content, run.start(), run.end() + 1)
+    )
+
+def _count_indicator_matches(scans: List[Tuple[re.Pattern, Tuple[int, ...]]], indicator_count: int, content: str) -> List[int]:
+    """Count the matches of each indicator, in indicator order"""
+    counts = [0] * indicator_count
+    for pattern, indices in scans:
+        if pattern.groups:
+            for match in pattern.finditer(content):
+                counts[indices[match.lastindex - 1]] += 1
+        else:
+            counts[indices[0]] = len(pattern.findall(content))
+    return counts
+
+# Analyzer of a document worker process, unpickled once by the pool initializer
+# instead of once per document
+_worker_analyzer = None
+
+def _init_document_worker(analyzer) -> None:
+    """Keep the analyzer a worker process analyzes its documents with"""
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+
+def _process_document_in_worker(pdf_path: str) -> Dict[str, Any]:
+    """Analyze one document with the worker's analyzer"""
+    return _worker_analyzer.process_single_document_enhanced(pdf_path)
 
 class EnhancedAdaptiveDocumentAnalyzer:
     def __init__(self):
@@ -24,6 +264,11 @@ class EnhancedAdaptiveDocumentAnalyzer:
             'contextual_relevance': 0.15,        # Context-aware relevance
         }
         
+        # Weight vector in the order the relevance sub-scores are combined
+        self.relevance_weights = tuple(self.analysis_weights[name] for name in (
+            'structural_signature_match', 'information_density', 'content_organization', 'contextual_relevance'
+        ))
+        
         # Enhanced structural patterns with better discrimination
         self.structural_patterns = {
             'form_management': {
@@ -131,20 +376,121 @@ class EnhancedAdaptiveDocumentAnalyzer:
                 'description': 'Configuring, maintaining, and troubleshooting software systems and tools'
             }
         }
+        
+        # Procedural indicators used to auto-detect the job from content
+        self.job_indicators = {
+            'create_manage_forms': [
+                r'\b(?:create|prepare|design).*(?:form|field|template)\b',
+                r'\b(?:fillable|interactive|signature|workflow)\b',
+                r'\b(?:distribute|collect|manage).*(?:responses|data)\b'
+            ],
+            'document_collaboration': [
+                r'\b(?:share|collaborate|review|comment)\b',
+                r'\b(?:approve|sign|authorize|track)\b',
+                r'\b(?:team|group|multiple users|recipients)\b'
+            ],
+            'content_production': [
+                r'\b(?:create|convert|generate|produce).*(?:document|PDF|content)\b',
+                r'\b(?:edit|modify|format|design)\b',
+                r'\b(?:export|publish|save|output)\b'
+            ],
+            'system_configuration': [
+                r'\b(?:configure|setup|install|enable)\b',
+                r'\b(?:settings|preferences|options|properties)\b',
+                r'\b(?:troubleshoot|fix|resolve|debug)\b'
+            ]
+        }
+        
+        # Compile the indicator patterns once up front. Every indicator also gets an id
+        # in the shared automaton, which scans for all of them in one pass
+        all_indicators = []
+        self.indicator_groups = {'structural': {}, 'job': {}}
+        structural_indicators = {pattern_type: pattern_info['indicators'] for pattern_type, pattern_info in self.structural_patterns.items()}
+        for group, categories, flags in (('structural', structural_indicators, re.IGNORECASE | re.MULTILINE),
+                                         ('job', self.job_indicators, re.IGNORECASE)):
+            for category, indicators in categories.items():
+                indicator_ids = range(len(all_indicators), len(all_indicators) + len(indicators))
+                all_indicators.extend(indicators)
+                self.indicator_groups[group][category] = (_indicator_scans(indicators, flags), indicator_ids)
+        
+        for pattern_info in self.structural_patterns.values():
+            pattern_info['indicators'] = [
+                re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in pattern_info['indicators']
+            ]
+        for job_type, indicators in self.job_indicators.items():
+            self.job_indicators[job_type] = [re.compile(pattern, re.IGNORECASE) for pattern in indicators]
+        
+        self.indicator_count = len(all_indicators)
+        self.indicator_automaton = _build_indicator_automaton(all_indicators) if ahocorasick is not None else None
+        
+        # Canonical category keys of persona and job names, seeded with the known
+        # categories and memoized for other spellings
+        self.category_keys = {category: category for category in (*self.persona_patterns, *self.job_indicators)}
+    
+    def category_key(self, name: str) -> str:
+        """Canonical category key of a persona or job name (e.g. 'HR Professional' -> 'hr_professional')"""
+        key = self.category_keys.get(name)
+        if key is None:
+            key = self.category_keys[name] = name.lower().replace(' ', '_')
+        return key
     
-    def auto_detect_persona_from_content(self, all_blocks: List[Dict[str, Any]]) -> str:
+    def count_indicator_matches(self, group: str, content: str, content_lower: str = None) -> Dict[str, List[int]]:
+        """Count the matches of each indicator in a group ('structural' or 'job'), per category"""
+        
+        categories = self.indicator_groups[group]
+        
+        # The automaton runs on lowercased text, which is equivalent to the case-insensitive
+        # patterns unless the content has one of the case folding exceptions
+        if self.indicator_automaton is not None and not CASE_FOLD_EXCEPTION_RE.search(content):
+            if content_lower is None:
+                content_lower = content.lower()
+            counts = _count_automaton_matches(self.indicator_automaton, self.indicator_count, content_lower)
+            return {category: [counts[indicator_id] for indicator_id in indicator_ids]
+                    for category, (scans, indicator_ids) in categories.items()}
+        
+        return {category: _count_indicator_matches(scans, len(indicator_ids), content)
+                for category, (scans, indicator_ids) in categories.items()}
+    
+    def count_window_indicator_matches(self, group: str, lines: List[str], windows: List[Tuple[int, int]]) -> List[Dict[str, List[int]]]:
+        """Count the indicator matches of each window of lines, from one scan of all the lines.
+        
+        No indicator match crosses a line break, so a window's counts are the sum of
+        the counts of its lines.
+        """
+        # Only the lines up to the end of the last window are scanned
+        content = '\n'.join(lines[:max((end for _, end in windows), default=0)])
+        if self.indicator_automaton is None or CASE_FOLD_EXCEPTION_RE.search(content):
+            return [self.count_indicator_matches(group, '\n'.join(lines[start:end])) for start, end in windows]
+        
+        line_matches = defaultdict(list)
+        for line, indicator_id in _iter_automaton_matches(self.indicator_automaton, self.indicator_count, content.lower()):
+            line_matches[line].append(indicator_id)
+        
+        categories = self.indicator_groups[group]
+        window_counts = []
+        for start, end in windows:
+            counts = [0] * self.indicator_count
+            for line in range(start, end):
+                for indicator_id in line_matches.get(line, ()):
+                    counts[indicator_id] += 1
+            window_counts.append({category: [counts[indicator_id] for indicator_id in indicator_ids]
+                                  for category, (scans, indicator_ids) in categories.items()})
+        return window_counts
+    
+    def auto_detect_persona_from_content(self, all_blocks: List[Dict[str, Any]], all_content: str = None) -> str:
         """Auto-detect the most appropriate persona based on content structure"""
         
         # Analyze structural patterns in content
         pattern_scores = {}
         
-        all_content = ' '.join([block['content'].lower() for block in all_blocks])
+        if all_content is None:
+            all_content = ' '.join([block['content'].lower() for block in all_blocks])
+        indicator_counts = self.count_indicator_matches('structural', all_content, all_content)
         
         for pattern_type, pattern_info in self.structural_patterns.items():
             score = 0.0
             
-            for indicator in pattern_info['indicators']:
-                matches = len(re.findall(indicator, all_content, re.IGNORECASE))
+            for matches in indicator_counts[pattern_type]:
                 score += matches * pattern_info['weight']
             
             # Apply complexity bonus
@@ -168,40 +514,19 @@ class EnhancedAdaptiveDocumentAnalyzer:
         
         return 'business_professional'  # Default fallback
     
-    def auto_detect_job_from_content(self, all_blocks: List[Dict[str, Any]]) -> str:
+    def auto_detect_job_from_content(self, all_blocks: List[Dict[str, Any]], all_content: str = None) -> str:
         """Auto-detect the most appropriate job based on content structure"""
         
         # Analyze procedural complexity and type
-        all_content = ' '.join([block['content'].lower() for block in all_blocks])
+        if all_content is None:
+            all_content = ' '.join([block['content'].lower() for block in all_blocks])
         
-        job_indicators = {
-            'create_manage_forms': [
-                r'\b(?:create|prepare|design).*(?:form|field|template)\b',
-                r'\b(?:fillable|interactive|signature|workflow)\b',
-                r'\b(?:distribute|collect|manage).*(?:responses|data)\b'
-            ],
-            'document_collaboration': [
-                r'\b(?:share|collaborate|review|comment)\b',
-                r'\b(?:approve|sign|authorize|track)\b',
-                r'\b(?:team|group|multiple users|recipients)\b'
-            ],
-            'content_production': [
-                r'\b(?:create|convert|generate|produce).*(?:document|PDF|content)\b',
-                r'\b(?:edit|modify|format|design)\b',
-                r'\b(?:export|publish|save|output)\b'
-            ],
-            'system_configuration': [
-                r'\b(?:configure|setup|install|enable)\b',
-                r'\b(?:settings|preferences|options|properties)\b',
-                r'\b(?:troubleshoot|fix|resolve|debug)\b'
-            ]
-        }
+        indicator_counts = self.count_indicator_matches('job', all_content, all_content)
         
         job_scores = {}
-        for job_type, indicators in job_indicators.items():
+        for job_type in self.job_indicators:
             score = 0
-            for indicator in indicators:
-                matches = len(re.findall(indicator, all_content, re.IGNORECASE))
+            for matches in indicator_counts[job_type]:
                 score += matches
             job_scores[job_type] = score
         
@@ -210,20 +535,28 @@ class EnhancedAdaptiveDocumentAnalyzer:
         
         return 'content_production'  # Default fallback
     
-    def extract_structural_personas_enhanced(self, all_blocks: List[Dict[str, Any]], collection_profile: Dict[str, Any]) -> List[Dict[str, str]]:
+    def collection_signature_score(self, all_blocks: List[Dict[str, Any]], persona_category: str, job_category: str, signature_features: Dict[str, Any] = None) -> float:
+        """Structural signature score of a block collection, from its precomputed signature features when given"""
+        
+        if signature_features is None:
+            return self.structural_signatures.analyze_structural_signature(all_blocks, persona_category, job_category)
+        
+        return self.structural_signatures.score_from_features(signature_features, persona_category, job_category)
+    
+    def extract_structural_personas_enhanced(self, all_blocks: List[Dict[str, Any]], collection_profile: Dict[str, Any], all_content: str = None, signature_features: Dict[str, Any] = None) -> List[Dict[str, str]]:
         """Enhanced persona extraction using structural signature analysis"""
         personas = []
         
         # Auto-detect the most likely persona
-        detected_persona = self.auto_detect_persona_from_content(all_blocks)
+        detected_persona = self.auto_detect_persona_from_content(all_blocks, all_content)
         
         # Analyze against all persona patterns using structural signatures
         persona_scores = {}
         
         for persona_type, pattern_info in self.persona_patterns.items():
             # Use enhanced structural signature analysis
-            signature_score = self.structural_signatures.analyze_structural_signature(
-                all_blocks, persona_type, 'create_manage_forms'  # Default job for scoring
+            signature_score = self.collection_signature_score(
+                all_blocks, persona_type, 'create_manage_forms', signature_features  # Default job for scoring
             )
             
             # Apply threshold and confidence calculation
@@ -250,20 +583,20 @@ class EnhancedAdaptiveDocumentAnalyzer:
         
         return personas[:3]  # Return top 3 personas
     
-    def extract_structural_jobs_enhanced(self, all_blocks: List[Dict[str, Any]], collection_profile: Dict[str, Any]) -> List[Dict[str, str]]:
+    def extract_structural_jobs_enhanced(self, all_blocks: List[Dict[str, Any]], collection_profile: Dict[str, Any], all_content: str = None, signature_features: Dict[str, Any] = None) -> List[Dict[str, str]]:
         """Enhanced job extraction using structural signature analysis"""
         jobs = []
         
         # Auto-detect the most likely job
-        detected_job = self.auto_detect_job_from_content(all_blocks)
+        detected_job = self.auto_detect_job_from_content(all_blocks, all_content)
         
         # Analyze against all job patterns using structural signatures
         job_scores = {}
         
         for job_type, pattern_info in self.job_patterns.items():
             # Use enhanced structural signature analysis
-            signature_score = self.structural_signatures.analyze_structural_signature(
-                all_blocks, 'hr_professional', job_type  # Use HR as default persona for scoring
+            signature_score = self.collection_signature_score(
+                all_blocks, 'hr_professional', job_type, signature_features  # Use HR as default persona for scoring
             )
             
             # Apply threshold and confidence calculation
@@ -293,62 +626,82 @@ class EnhancedAdaptiveDocumentAnalyzer:
     def calculate_enhanced_relevance_score(self, block: Dict[str, Any], persona: str, job: str, collection_profile: Dict[str, Any]) -> float:
         """Calculate enhanced relevance score using structural signatures"""
         
-        # Get persona and job categories
-        persona_category = persona.lower().replace(' ', '_')
-        job_category = job.lower().replace(' ', '_')
+        return self.calculate_enhanced_relevance_scores([block], persona, job, collection_profile)[0]
+    
+    def calculate_enhanced_relevance_scores(self, blocks: List[Dict[str, Any]], persona: str, job: str, collection_profile: Dict[str, Any]) -> List[float]:
+        """Calculate enhanced relevance scores for a batch of blocks"""
         
-        # Use structural signature analysis
-        signature_score = self.structural_signatures.analyze_structural_signature(
-            [block], persona_category, job_category
-        )
+        # Get persona and job categories
+        persona_category = self.category_key(persona)
+        job_category = self.category_key(job)
         
-        # Calculate traditional structural scores
-        structural_score = block.get('complexity_score', 0.0)
-        density_score = block.get('density_score', 0.0)
-        organization_score = block.get('organization_score', 0.0)
+        # Unpack the enhanced weight vector once for the whole batch
+        signature_weight, density_weight, organization_weight, contextual_weight = self.relevance_weights
         
-        # Calculate contextual relevance (non-keyword based)
-        contextual_score = self.calculate_contextual_relevance_enhanced(block, persona, job)
+        # Blocks keep their signature features, so scoring them again for another
+        # persona and job only repeats the arithmetic
+        signatures = self.structural_signatures
+        has_signature = signatures.get_signature(persona_category, job_category) is not None
         
-        # Weighted combination using enhanced weights
-        final_score = (
-            signature_score * self.analysis_weights['structural_signature_match'] +
-            density_score * self.analysis_weights['information_density'] +
-            organization_score * self.analysis_weights['content_organization'] +
-            contextual_score * self.analysis_weights['contextual_relevance']
-        )
+        relevance_scores = []
+        for block in blocks:
+            # Use structural signature analysis
+            signature_score = signatures.score_from_features(
+                _block_signature_features(signatures, block), persona_category, job_category
+            ) if has_signature else 0.0
+            
+            # Calculate traditional structural scores
+            density_score = block.get('density_score', 0.0)
+            organization_score = block.get('organization_score', 0.0)
+            
+            # Calculate contextual relevance (non-keyword based)
+            contextual_score = self.calculate_contextual_relevance_enhanced(block, persona, job)
+            
+            # Weighted combination using enhanced weights
+            final_score = (
+                signature_score * signature_weight +
+                density_score * density_weight +
+                organization_score * organization_weight +
+                contextual_score * contextual_weight
+            )
+            
+            # Cap at 1.0 without a builtin call per block
+            relevance_scores.append(1.0 if final_score > 1.0 else final_score)
         
-        return min(final_score, 1.0)
+        return relevance_scores
     
     def calculate_contextual_relevance_enhanced(self, block: Dict[str, Any], persona: str, job: str) -> float:
         """Calculate contextual relevance using structural patterns, not keywords"""
         
-        content = block.get('content', '').lower()
+        # The score depends only on the block content, so it is computed once per block
+        context_score = block.get('contextual_score')
+        if context_score is not None:
+            return context_score
+        
+        content = _block_content_lower(block)
         
         # Analyze structural context indicators
         context_score = 0.0
         
         # Check for procedural structure quality
-        numbered_steps = len(re.findall(r'^\s*\d+\.\s+', content, re.MULTILINE))
-        if numbered_steps >= 3:
+        if _has_matches(_NUMBERED_STEP_RE, content, 3):
             context_score += 0.3
         
-        # Check for hierarchical organization
-        bullet_points = len(re.findall(r'^\s*[•\-\*]\s+', content, re.MULTILINE))
-        if bullet_points >= 3:
+        # Check for hierarchical organization. Every bullet point holds exactly one marker,
+        # so counting the markers rules out most blocks without running the pattern
+        if sum(content.count(marker) for marker in _BULLET_MARKERS) >= 3 and _has_matches(_BULLET_POINT_RE, content, 3):
             context_score += 0.2
         
         # Check for technical specificity (UI elements, specific actions)
-        ui_references = len(re.findall(r'\b(?:select|click|choose|press|drag|type|enter)\b', content))
-        if ui_references >= 3:
+        if _has_matches(_UI_REFERENCE_RE, content, 3):
             context_score += 0.3
         
         # Check for workflow indicators
-        workflow_indicators = len(re.findall(r'\b(?:then|next|after|before|once|when|if)\b', content))
-        if workflow_indicators >= 2:
+        if _has_matches(_WORKFLOW_INDICATOR_RE, content, 2):
             context_score += 0.2
         
-        return min(context_score, 1.0)
+        block['contextual_score'] = min(context_score, 1.0)
+        return block['contextual_score']
     
     def process_documents_enhanced(self, pdf_paths: List[str], input_persona: str = "", input_job: str = "") -> Dict[str, Any]:
         """Enhanced processing with better persona and job detection"""
@@ -369,9 +722,17 @@ class EnhancedAdaptiveDocumentAnalyzer:
         all_content_blocks = []
         document_types = []
         
-        # Process each document with enhanced methods
-        for pdf_path in pdf_paths:
-            doc_data = self.process_single_document_enhanced(pdf_path)
+        # Process each document with enhanced methods. Documents are independent, so
+        # several of them are spread over a pool of worker processes, each of which
+        # receives the analyzer once and then takes one document at a time
+        max_workers = min(os.cpu_count() or 1, len(pdf_paths))
+        if max_workers > 1:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_document_worker, initargs=(self,)) as executor:
+                all_doc_data = list(executor.map(_process_document_in_worker, pdf_paths))
+        else:
+            all_doc_data = [self.process_single_document_enhanced(pdf_path) for pdf_path in pdf_paths]
+        
+        for doc_data in all_doc_data:
             collection_data['documents'].append(doc_data)
             all_content_blocks.extend(doc_data['content_blocks'])
             document_types.append(doc_data['document_type'])
@@ -383,9 +744,15 @@ class EnhancedAdaptiveDocumentAnalyzer:
         collection_data['structural_patterns'] = self.extract_structural_patterns(all_content_blocks)
         collection_data['content_themes'] = self.extract_content_themes(all_content_blocks)
         
-        # Enhanced persona and job extraction
-        collection_data['extracted_personas'] = self.extract_structural_personas_enhanced(all_content_blocks, collection_data['collection_profile'])
-        collection_data['extracted_jobs'] = self.extract_structural_jobs_enhanced(all_content_blocks, collection_data['collection_profile'])
+        # Enhanced persona and job extraction over the lowercased collection text, built once.
+        # Both score signatures from the collection's signature features, computed once
+        # from the word counts the blocks already carry
+        all_content = ' '.join([_block_content_lower(block) for block in all_content_blocks])
+        signature_features = self.structural_signatures.precompute_block_features(
+            all_content_blocks, word_count=sum(block['word_count'] for block in all_content_blocks)
+        )
+        collection_data['extracted_personas'] = self.extract_structural_personas_enhanced(all_content_blocks, collection_data['collection_profile'], all_content, signature_features)
+        collection_data['extracted_jobs'] = self.extract_structural_jobs_enhanced(all_content_blocks, collection_data['collection_profile'], all_content, signature_features)
         
         print(f"Discovered {len(collection_data['extracted_personas'])} personas and {len(collection_data['extracted_jobs'])} jobs")
         
@@ -398,12 +765,14 @@ class EnhancedAdaptiveDocumentAnalyzer:
         )
         
         # Calculate relevance scores with enhanced method
-        for block in all_content_blocks:
-            relevance_score = self.calculate_enhanced_relevance_score(block, effective_persona, effective_job, collection_data['collection_profile'])
+        relevance_scores = self.calculate_enhanced_relevance_scores(all_content_blocks, effective_persona, effective_job, collection_data['collection_profile'])
+        for block, relevance_score in zip(all_content_blocks, relevance_scores):
             block['relevance_score'] = relevance_score
         
-        all_content_blocks.sort(key=lambda x: x['relevance_score'], reverse=True)
-        final_blocks = self.ensure_document_diversity(all_content_blocks)
+        # Rank block indices by the flat score list and walk the ranking lazily, so
+        # the diversity filter only touches the blocks it needs to look at
+        ranking = sorted(range(len(relevance_scores)), key=relevance_scores.__getitem__, reverse=True)
+        final_blocks = self.ensure_document_diversity(all_content_blocks[index] for index in ranking)
         
         # Prepare enhanced output
         output = {
@@ -427,7 +796,7 @@ class EnhancedAdaptiveDocumentAnalyzer:
         }
         
         # Add top sections
-        for rank, block in enumerate(final_blocks[:10], 1):
+        for rank, block in enumerate(islice(final_blocks, 10), 1):
             output["extracted_sections"].append({
                 "document": block["document"],
                 "section_title": block["title"],
@@ -470,20 +839,20 @@ class EnhancedAdaptiveDocumentAnalyzer:
         }
         
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                doc_data['page_count'] = len(pdf_reader.pages)
+            with open_page_texts(pdf_path) as (page_count, page_texts):
+                doc_data['page_count'] = page_count
                 
-                all_text = ""
-                for page_num, page in enumerate(pdf_reader.pages, 1):
-                    page_text = page.extract_text()
-                    all_text += page_text
+                # Pages are analyzed as they stream in; the document text is joined once at the end
+                document_pages = []
+                for page_num, page_text in enumerate(page_texts, 1):
+                    document_pages.append(page_text)
                     
                     # Extract content blocks with enhanced analysis
                     page_blocks = self.extract_content_blocks_enhanced(page_text, page_num, document_name)
                     doc_data['content_blocks'].extend(page_blocks)
                 
                 # Enhanced document classification
+                all_text = ''.join(document_pages)
                 doc_data['document_type'] = self.classify_document_type_enhanced(all_text)
                 doc_data['structural_profile'] = self.analyze_document_structure(all_text)
                 
@@ -494,7 +863,7 @@ class EnhancedAdaptiveDocumentAnalyzer:
     
     def extract_content_blocks_enhanced(self, page_text: str, page_num: int, document_name: str) -> List[Dict[str, Any]]:
         """Enhanced content block extraction"""
-        lines = [line.strip() for line in page_text.split('\n') if line.strip()]
+        lines = [line for line in (raw_line.strip() for raw_line in page_text.split('\n')) if line]
         content_blocks = []
         
         if len(lines) < 5:
@@ -504,14 +873,33 @@ class EnhancedAdaptiveDocumentAnalyzer:
         window_size = 15  # Larger window for better context
         step_size = 8     # Larger step for less overlap
         
+        # Join the page lines once; each window's content is a slice of the joined text
+        page_content = '\n'.join(lines)
+        line_starts = [0]
+        line_starts.extend(accumulate(len(line) + 1 for line in lines))
+        
+        # Windows too short to pass the threshold are skipped before any scoring; the
+        # word count of the others is shared by the analysis and density scoring
+        window_contents = {}
         for i in range(0, len(lines) - window_size + 1, step_size):
+            window_content = page_content[line_starts[i]:line_starts[i + window_size] - 1]
+            word_count = len(window_content.split())
+            if word_count >= _MIN_BLOCK_WORDS:
+                window_contents[i] = (window_content, word_count)
+        
+        # Count the structural indicators of all windows in one scan of the page
+        window_indicator_counts = self.count_window_indicator_matches(
+            'structural', lines, [(i, i + window_size) for i in window_contents])
+        
+        for (i, (window_content, word_count)), indicator_counts in zip(window_contents.items(), window_indicator_counts):
             window_lines = lines[i:i + window_size]
             
             # Enhanced block analysis
-            block_analysis = self.analyze_content_window_enhanced(window_lines, i, page_num, document_name)
+            block_analysis = self.analyze_content_window_enhanced(window_lines, i, page_num, document_name, window_content,
+                                                                  indicator_counts, word_count, discard_below_threshold=True)
             
             # Enhanced threshold check
-            if self.meets_enhanced_threshold(block_analysis):
+            if block_analysis is not None:
                 content_blocks.append(block_analysis)
         
         # Enhanced merging and filtering
@@ -519,9 +907,14 @@ class EnhancedAdaptiveDocumentAnalyzer:
         
         return merged_blocks
     
-    def analyze_content_window_enhanced(self, window_lines: List[str], start_idx: int, page_num: int, document_name: str) -> Dict[str, Any]:
-        """Enhanced content window analysis"""
-        content_text = '\n'.join(window_lines)
+    def analyze_content_window_enhanced(self, window_lines: List[str], start_idx: int, page_num: int, document_name: str, content_text: str = None,
+                                        indicator_counts: Dict[str, List[int]] = None, word_count: int = None,
+                                        discard_below_threshold: bool = False) -> Optional[Dict[str, Any]]:
+        """Enhanced content window analysis, or None for a discarded window below the enhanced threshold"""
+        if content_text is None:
+            content_text = '\n'.join(window_lines)
+        if word_count is None:
+            word_count = len(content_text.split())
         
         analysis = {
             'content': content_text,
@@ -529,7 +922,7 @@ class EnhancedAdaptiveDocumentAnalyzer:
             'page_number': page_num,
             'document': document_name,
             'start_index': start_idx,
-            'word_count': len(content_text.split()),
+            'word_count': word_count,
             'structural_elements': {},
             'content_type': 'general',
             'complexity_score': 0.0,
@@ -541,28 +934,34 @@ class EnhancedAdaptiveDocumentAnalyzer:
         # Enhanced structural analysis
         analysis['structural_elements'] = self.analyze_structural_elements_enhanced(content_text)
         
-        # Enhanced content type classification
-        analysis['content_type'] = self.classify_content_type_enhanced(window_lines, content_text)
-        
         # Enhanced scoring
         analysis['complexity_score'] = self.calculate_structural_complexity_enhanced(analysis)
-        analysis['density_score'] = self.calculate_information_density_enhanced(content_text)
+        analysis['density_score'] = self.calculate_information_density_enhanced(content_text, word_count)
         analysis['uniqueness_score'] = self.calculate_structural_uniqueness_enhanced(analysis)
         
+        # The threshold only depends on the scores above, so a discarded window
+        # skips classification and title generation
+        if discard_below_threshold and not self.meets_enhanced_threshold(analysis):
+            return None
+        
+        # Enhanced content type classification
+        analysis['content_type'] = self.classify_content_type_enhanced(window_lines, content_text, indicator_counts)
+        
         # Enhanced title generation
         analysis['title'] = self.generate_structural_title_enhanced(window_lines, analysis['content_type'])
         
         return analysis
     
-    def classify_content_type_enhanced(self, lines: List[str], content_text: str) -> str:
+    def classify_content_type_enhanced(self, lines: List[str], content_text: str, indicator_counts: Dict[str, List[int]] = None) -> str:
         """Enhanced content type classification"""
         # Check against enhanced document type patterns
         type_scores = {}
+        if indicator_counts is None:
+            indicator_counts = self.count_indicator_matches('structural', content_text)
         
         for doc_type, pattern_info in self.structural_patterns.items():
             score = 0
-            for pattern in pattern_info['indicators']:
-                matches = len(re.findall(pattern, content_text, re.MULTILINE | re.IGNORECASE))
+            for matches in indicator_counts[doc_type]:
                 score += matches * pattern_info['weight']
             type_scores[doc_type] = score
         
@@ -614,13 +1013,11 @@ class EnhancedAdaptiveDocumentAnalyzer:
         
         return min(complexity * 2, 1.0)  # Scale and cap at 1.0
     
-    def calculate_information_density_enhanced(self, content: str) -> float:
+    def calculate_information_density_enhanced(self, content: str, word_count: int = None) -> float:
         """Enhanced information density calculation"""
-        if not content.strip():
-            return 0.0
-        
-        words = content.split()
-        word_count = len(words)
+        # Whitespace-only content has no words, so one split covers the emptiness check
+        if word_count is None:
+            word_count = len(content.split())
         
         if word_count == 0:
             return 0.0
@@ -629,11 +1026,12 @@ class EnhancedAdaptiveDocumentAnalyzer:
         info_score = 0.0
         
         # High-value information patterns
-        info_score += len(re.findall(r'\b\d+(?:\.\d+)?\s*(?:€|$|£|%|km|miles|hours?)\b', content)) * 3.0
-        info_score += len(re.findall(r'\b\d{1,2}:\d{2}(?:\s*[ap]m)?\b', content)) * 2.5
-        info_score += len(re.findall(r'\b(?:www\.|http|@[\w.-]+)\b', content)) * 2.0
-        info_score += len(re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*(?:\s+(?:Street|Hotel|Restaurant|Museum))\b', content)) * 1.5
-        info_score += len(re.findall(r'^\s*[•\-\*]\s+[A-Z]', content, re.MULTILINE)) * 1.0
+        quantity_re, clock_time_re, web_reference_re = _numeric_density_patterns(content)
+        info_score += len(quantity_re.findall(content)) * 3.0
+        info_score += len(clock_time_re.findall(content)) * 2.5
+        info_score += len(web_reference_re.findall(content)) * 2.0
+        info_score += _count_named_places(content) * 1.5
+        info_score += len(_CAPITALIZED_BULLET_RE.findall(content)) * 1.0
         
         return min(info_score / word_count * 10, 2.0)
     
@@ -660,7 +1058,7 @@ class EnhancedAdaptiveDocumentAnalyzer:
             if elements.get(element, 0) > 0:
                 uniqueness_score += 0.1
         
-        return min(uniqueness_score, 1.0)
+        return 1.0 if uniqueness_score > 1.0 else uniqueness_score
     
     def generate_structural_title_enhanced(self, lines: List[str], content_type: str) -> str:
         """Enhanced title generation"""
@@ -676,24 +1074,30 @@ class EnhancedAdaptiveDocumentAnalyzer:
             
             score = 0
             
+            # Capitalized words are maximal letter runs, so the proper nouns among
+            # them are just the ones at least three letters long
+            words = _TITLE_WORD_OR_NUMBER_RE.findall(line_clean)
+            caps = [word for word in words if word]
+            
             # Proper nouns indicate specific content
-            proper_nouns = len(re.findall(r'\b[A-Z][a-z]{2,}\b', line_clean))
+            proper_nouns = sum(1 for word in caps if len(word) > 2)
             score += proper_nouns * 2
             
             # Numbers and measurements
-            numbers = len(re.findall(r'\b\d+(?:\.\d+)?\b', line_clean))
+            numbers = len(words) - len(caps)
             score += numbers * 1.5
             
-            # Avoid list markers
-            if re.match(r'^\s*[•\-\*\+\d+\.\)]\s+', line_clean):
+            # Avoid list markers: the line is stripped, so a marker is its first
+            # character followed by whitespace
+            if (line_clean[0] in _TITLE_LIST_MARKERS or line_clean[0].isdecimal()) and line_clean[1].isspace():
                 score -= 2
             
-            # Prefer lines with colons (key-value structure)
-            if ':' in line_clean and len(line_clean.split(':')) == 2:
+            # Prefer lines with colons (key-value structure), i.e. exactly one colon
+            if line_clean.count(':') == 1:
                 score += 3
             
             # Prefer capitalized words
-            caps_words = len(re.findall(r'\b[A-Z][a-z]+\b', line_clean))
+            caps_words = len(caps)
             score += caps_words * 0.5
             
             if score > best_score:
@@ -701,29 +1105,24 @@ class EnhancedAdaptiveDocumentAnalyzer:
                 best_title = line_clean
         
         if best_title:
-            # Clean up the title
-            best_title = re.sub(r'^\d+[\.\)]\s*', '', best_title)
-            best_title = re.sub(r'^[•\-\*\+]\s*', '', best_title)
+            # Clean up the title; each prefix can only match when the title starts
+            # with a digit or a bullet marker
+            if best_title[0].isdecimal():
+                best_title = _TITLE_NUMBER_PREFIX_RE.sub('', best_title)
+            if best_title.startswith(_TITLE_BULLET_MARKERS):
+                best_title = _TITLE_BULLET_PREFIX_RE.sub('', best_title)
             
             if len(best_title) > 80:
                 best_title = best_title[:77] + "..."
             
             return best_title
         
-        # Fallback titles based on content type
-        fallback_titles = {
-            'procedural': 'Step-by-Step Instructions',
-            'informational': 'Information Summary',
-            'reference': 'Reference Information',
-            'general': 'Content Section'
-        }
-        
-        return fallback_titles.get(content_type, 'Content Section')
+        return _FALLBACK_TITLES.get(content_type, 'Content Section')
     
     def meets_enhanced_threshold(self, analysis: Dict[str, Any]) -> bool:
         """Enhanced threshold checking"""
         # More lenient word count for better coverage
-        if analysis['word_count'] < 40:
+        if analysis['word_count'] < _MIN_BLOCK_WORDS:
             return False
         
         # Lower complexity threshold but require some structure
@@ -746,60 +1145,79 @@ class EnhancedAdaptiveDocumentAnalyzer:
         if not content_blocks:
             return []
         
-        # Sort by start index
-        sorted_blocks = sorted(content_blocks, key=lambda x: x['start_index'])
+        # Pull the fields the sweep compares into parallel columns, one row per block, and
+        # sort the rows by start index (blocks arrive in scan order, which the sort detects
+        # as one run); the blocks themselves are only looked up again for the survivors
+        starts = [block['start_index'] for block in content_blocks]
+        line_counts = [len(block['lines']) for block in content_blocks]
+        combined_scores = [block['complexity_score'] + block['density_score'] for block in content_blocks]
+        order = sorted(range(len(content_blocks)), key=starts.__getitem__)
+        if order != list(range(len(content_blocks))):
+            content_blocks = [content_blocks[row] for row in order]
+            starts = [starts[row] for row in order]
+            line_counts = [line_counts[row] for row in order]
+            combined_scores = [combined_scores[row] for row in order]
         merged = []
         
-        current_block = sorted_blocks[0]
+        current = 0
+        
+        # The end and overlap limit of the current block only change with it. The limit
+        # is never negative, so a gap before the next block fails it like no overlap
+        current_end = starts[current] + line_counts[current]
+        overlap_limit = line_counts[current] * 0.3  # 30% overlap threshold
         
-        for next_block in sorted_blocks[1:]:
+        for next_index in range(1, len(content_blocks)):
             # Check for overlap
-            current_end = current_block['start_index'] + len(current_block['lines'])
-            overlap = max(0, current_end - next_block['start_index'])
-            
-            if overlap > len(current_block['lines']) * 0.3:  # 30% overlap threshold
+            if current_end - starts[next_index] > overlap_limit:
                 # Keep the block with higher combined score
-                current_combined = current_block['complexity_score'] + current_block['density_score']
-                next_combined = next_block['complexity_score'] + next_block['density_score']
-                
-                if next_combined > current_combined:
-                    current_block = next_block
+                if not combined_scores[next_index] > combined_scores[current]:
+                    continue
             else:
-                merged.append(current_block)
-                current_block = next_block
+                merged.append(current)
+            
+            current = next_index
+            current_end = starts[current] + line_counts[current]
+            overlap_limit = line_counts[current] * 0.3
         
-        merged.append(current_block)
+        merged.append(current)
         
         # Enhanced filtering - keep more blocks but ensure quality
-        quality_blocks = [block for block in merged if 
-                         (block['complexity_score'] + block['density_score']) > 0.4]
+        quality_indices = [index for index in merged if combined_scores[index] > 0.4]
         
-        # Sort by combined score
-        quality_blocks.sort(key=lambda x: (x['complexity_score'] + x['density_score']), reverse=True)
+        # Select the top blocks by combined score (ties keep their order, as in a stable sort)
+        top_indices = heapq.nlargest(25, quality_indices, key=combined_scores.__getitem__)
         
-        return quality_blocks[:25]  # Return more blocks per document
+        return [content_blocks[index] for index in top_indices]  # Return more blocks per document
     
     def calculate_adaptive_relevance(self, block: Dict[str, Any], collection_data: Dict[str, Any]) -> float:
         """Calculate relevance with enhanced weighting"""
+        return self.calculate_adaptive_relevance_scores([block], collection_data)[0]
+    
+    def calculate_adaptive_relevance_scores(self, blocks: List[Dict[str, Any]], collection_data: Dict[str, Any]) -> List[float]:
+        """Calculate relevance with enhanced weighting for a batch of blocks"""
         # Enhanced scoring with better balance
         complexity_weight = 0.35
         density_weight = 0.35
         uniqueness_weight = 0.30
         
-        final_score = (
+        final_scores = (
             block['complexity_score'] * complexity_weight +
             block['density_score'] * density_weight +
             block['uniqueness_score'] * uniqueness_weight
+            for block in blocks
         )
         
-        return min(final_score, 1.0)
+        # Cap at 1.0 without a builtin call per block
+        return [1.0 if final_score > 1.0 else final_score for final_score in final_scores]
     
-    def ensure_document_diversity(self, blocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def ensure_document_diversity(self, blocks: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Ensure diverse representation with enhanced logic"""
         diverse_blocks = []
         doc_counts = {}
         max_per_doc = 4  # Allow more blocks per document
         
+        # Blocks arrive ranked, so each document keeps its best blocks; the total
+        # only grows when a block is kept, so the limit is checked there
         for block in blocks:
             doc_name = block.get('document', '')
             current_count = doc_counts.get(doc_name, 0)
@@ -807,9 +1225,9 @@ class EnhancedAdaptiveDocumentAnalyzer:
             if current_count < max_per_doc:
                 diverse_blocks.append(block)
                 doc_counts[doc_name] = current_count + 1
-            
-            if len(diverse_blocks) >= 15:  # Return more total blocks
-                break
+                
+                if len(diverse_blocks) >= 15:  # Return more total blocks
+                    break
         
         return diverse_blocks
 
@@ -4,6 +4,61 @@
 Enhanced persona detection that automatically adapts to any domain
 """
 
+# Optional Aho-Corasick automaton that finds every keyword in one pass over a
+# description; plain substring checks are used when pyahocorasick is not installed
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+def _build_keyword_automaton(category_keywords):
+    """Build an automaton mapping each keyword to the ids (positions) of the categories it scores for"""
+    keyword_category_ids = {}
+    for category_id, keywords in enumerate(category_keywords.values()):
+        for keyword in keywords:
+            keyword_category_ids.setdefault(keyword, []).append(category_id)
+    
+    automaton = ahocorasick.Automaton()
+    for keyword, category_ids in keyword_category_ids.items():
+        automaton.add_word(keyword, (keyword, tuple(category_ids)))
+    automaton.make_automaton()
+    return automaton
+
+def _leader_is_decided(scores, remaining):
+    """Check whether the first highest scoring category stays first whatever keywords are still found"""
+    leader = max(range(len(scores)), key=scores.__getitem__)
+    return all(
+        scores[leader] > scores[category_id] + remaining[category_id]
+        or (category_id > leader and scores[leader] == scores[category_id] + remaining[category_id])
+        for category_id in range(len(scores)) if category_id != leader
+    )
+
+def _score_keyword_categories(category_keywords, automaton, text_lower):
+    """Score each category by how many of its keywords occur in the text.
+    
+    The automaton scan stops as soon as the highest scoring category is decided,
+    so its scores may be partial, but their first maximum is the final one.
+    """
+    if automaton is None:
+        return {category: sum(1 for keyword in keywords if keyword in text_lower)
+                for category, keywords in category_keywords.items()}
+    
+    # Every keyword scores once, however often it occurs
+    scores = [0] * len(category_keywords)
+    remaining = [len(keywords) for keywords in category_keywords.values()]
+    found = set()
+    for _, (keyword, category_ids) in automaton.iter(text_lower):
+        if keyword in found:
+            continue
+        found.add(keyword)
+        
+        for category_id in category_ids:
+            scores[category_id] += 1
+            remaining[category_id] -= 1
+        if _leader_is_decided(scores, remaining):
+            break
+    return dict(zip(category_keywords, scores))
+
 class UniversalPersonaDetector:
     def __init__(self):
         # Universal persona categories based on information needs
@@ -74,55 +129,67 @@ class UniversalPersonaDetector:
                 'scope': 'option_discovery'
             }
         }
+        
+        # Job category indicators
+        self.job_indicators = {
+            'comprehensive_review': ['comprehensive', 'review', 'literature', 'complete', 'thorough', 'all'],
+            'specific_selection': ['find', 'select', 'choose', 'best', 'recommend', 'specific'],
+            'step_by_step_guidance': ['plan', 'guide', 'steps', 'how to', 'process', 'procedure'],
+            'comparative_analysis': ['compare', 'analyze', 'evaluate', 'trends', 'performance', 'versus'],
+            'discovery_exploration': ['discover', 'explore', 'identify', 'what', 'options', 'possibilities']
+        }
+        
+        # Keywords of each category, matched in one automaton pass when available
+        self.persona_keywords = {category: info['keywords'] for category, info in self.universal_personas.items()}
+        self.persona_automaton = _build_keyword_automaton(self.persona_keywords) if ahocorasick is not None else None
+        self.job_automaton = _build_keyword_automaton(self.job_indicators) if ahocorasick is not None else None
+        
+        # Structure sets of each category, merged per persona-job combination
+        self.persona_structural_needs = {category: frozenset(info['structural_needs']) for category, info in self.universal_personas.items()}
+        self.job_required_structures = {category: frozenset(info['required_structures']) for category, info in self.universal_jobs.items()}
+        
+        # Categories of the descriptions detected so far; the same persona and job
+        # are typically resolved again for every document and block
+        self.persona_categories = {}
+        self.job_categories = {}
     
     def auto_detect_persona_category(self, persona_description: str) -> str:
         """Automatically categorize any persona description"""
+        if persona_description in self.persona_categories:
+            return self.persona_categories[persona_description]
+        
         persona_lower = persona_description.lower()
         
         # Score each universal persona category
-        scores = {}
-        for category, info in self.universal_personas.items():
-            score = 0
-            for keyword in info['keywords']:
-                if keyword in persona_lower:
-                    score += 1
-            scores[category] = score
+        scores = _score_keyword_categories(self.persona_keywords, self.persona_automaton, persona_lower)
         
         # Return the highest scoring category
         if scores:
             best_category = max(scores.items(), key=lambda x: x[1])[0]
-            return best_category
+        else:
+            best_category = 'explorer'  # Default fallback
         
-        return 'explorer'  # Default fallback
+        self.persona_categories[persona_description] = best_category
+        return best_category
     
     def auto_detect_job_category(self, job_description: str) -> str:
         """Automatically categorize any job description"""
-        job_lower = job_description.lower()
+        if job_description in self.job_categories:
+            return self.job_categories[job_description]
         
-        # Job category indicators
-        job_indicators = {
-            'comprehensive_review': ['comprehensive', 'review', 'literature', 'complete', 'thorough', 'all'],
-            'specific_selection': ['find', 'select', 'choose', 'best', 'recommend', 'specific'],
-            'step_by_step_guidance': ['plan', 'guide', 'steps', 'how to', 'process', 'procedure'],
-            'comparative_analysis': ['compare', 'analyze', 'evaluate', 'trends', 'performance', 'versus'],
-            'discovery_exploration': ['discover', 'explore', 'identify', 'what', 'options', 'possibilities']
-        }
+        job_lower = job_description.lower()
         
         # Score each job category
-        scores = {}
-        for category, indicators in job_indicators.items():
-            score = 0
-            for indicator in indicators:
-                if indicator in job_lower:
-                    score += 1
-            scores[category] = score
+        scores = _score_keyword_categories(self.job_indicators, self.job_automaton, job_lower)
         
         # Return the highest scoring category
         if scores:
             best_category = max(scores.items(), key=lambda x: x[1])[0]
-            return best_category
+        else:
+            best_category = 'discovery_exploration'  # Default fallback
         
-        return 'discovery_exploration'  # Default fallback
+        self.job_categories[job_description] = best_category
+        return best_category
     
     def get_structural_requirements(self, persona: str, job: str) -> dict:
         """Get structural requirements for any persona-job combination"""
@@ -130,11 +197,11 @@ class UniversalPersonaDetector:
         job_category = self.auto_detect_job_category(job)
         
         # Combine requirements from persona and job
-        persona_needs = self.universal_personas[persona_category]['structural_needs']
-        job_needs = self.universal_jobs[job_category]['required_structures']
+        persona_needs = self.persona_structural_needs[persona_category]
+        job_needs = self.job_required_structures[job_category]
         
         # Merge and deduplicate
-        combined_needs = list(set(persona_needs + job_needs))
+        combined_needs = list(persona_needs | job_needs)
         
         return {
             'persona_category': persona_category,
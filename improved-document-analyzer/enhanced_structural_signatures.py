@@ -5,6 +5,233 @@ Enhanced structural signatures that better distinguish between different types o
 without relying on keywords
 """
 
+import re
+from itertools import chain
+
+from text_matching import CASE_FOLD_EXCEPTION_RE, RE2_MISMATCH_CHAR_RE, is_word_char
+
+# Optional Aho-Corasick automaton that counts the literal density words of every
+# indicator in one pass; the density patterns are run one by one without pyahocorasick
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Optional RE2 set that finds which of the counted patterns match the content in one
+# scan, so only those are counted; every pattern is run without google-re2
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# Patterns whose matches per word give the density of each content indicator
+_DENSITY_PATTERNS = {
+    'ui_element_references': [
+        r'\b(?:button|menu|toolbar|panel|dialog|window|field|checkbox|dropdown)\b',
+        r'\b(?:click|select|choose|press|drag|drop|hover)\b',
+        r'\b(?:All tools|File menu|Edit menu|View menu)\b'
+    ],
+    'action_verb_density': [
+        r'\b(?:create|make|build|generate|produce)\b',
+        r'\b(?:edit|modify|change|update|revise)\b',
+        r'\b(?:save|export|share|send|distribute)\b'
+    ],
+    'location_density': [
+        r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*(?:\s+(?:Street|Avenue|Hotel|Restaurant|Museum))\b',
+        r'\b(?:address|location|place|venue|destination)\b'
+    ],
+    'time_density': [
+        r'\b\d{1,2}:\d{2}(?:\s*[AP]M)?\b',
+        r'\b(?:morning|afternoon|evening|night|day|hour|minute)\b',
+        r'\b(?:Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)\b'
+    ],
+    'contact_density': [
+        r'\b(?:phone|email|website|contact|address)\b',
+        r'\b(?:www\.|http|@[\w.-]+|\+?\d{1,3}[-.\s]?\d{1,4})\b'
+    ],
+    'price_density': [
+        r'[€$£¥]\s*\d+(?:\.\d{2})?\b',
+        r'\b\d+(?:\.\d{2})?\s*(?:euros?|eur|usd|gbp|dollars?|pounds?)\b',
+        r'\b(?:cost|price|fee|budget|expense)\b'
+    ],
+    'technical_specificity': [
+        r'\b(?:configure|parameter|setting|option|property)\b',
+        r'\b(?:database|server|client|API|URL|XML|JSON)\b'
+    ],
+    'process_complexity': [
+        r'\b(?:workflow|process|procedure|protocol|methodology)\b',
+        r'\b(?:step|phase|stage|sequence|order)\b'
+    ],
+    'learning_progression': [
+        r'\b(?:beginner|intermediate|advanced|basic|complex)\b',
+        r'\b(?:learn|practice|master|understand|explore)\b'
+    ],
+    'example_density': [
+        r'\b(?:example|sample|illustration|demonstration)\b',
+        r'\b(?:for instance|such as|like|including)\b'
+    ]
+}
+_DENSITY_RES = {
+    indicator: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+    for indicator, patterns in _DENSITY_PATTERNS.items()
+}
+
+# Union of the patterns of each indicator, which finds a match exactly when one of the
+# patterns does. Counting stops after this one scan when there is nothing to count; the
+# patterns are still counted separately otherwise, as a union scan would let a match of
+# one pattern hide an overlapping match of another
+_DENSITY_UNION_RES = {
+    indicator: re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), re.IGNORECASE)
+    for indicator, patterns in _DENSITY_PATTERNS.items()
+}
+
+# Density patterns that are a plain alternation of whole words or phrases
+_LITERAL_DENSITY_PATTERN_RE = re.compile(r'\\b\(\?:([\w |]+)\)\\b')
+
+def _lowercase_pattern(pattern):
+    """Compile a case-insensitive pattern to match lowercased content case-sensitively, which is cheaper"""
+    source = re.sub(r'\\.|[A-Z]', lambda match: match.group().lower() if len(match.group()) == 1 else match.group(), pattern.pattern)
+    return re.compile(source, pattern.flags & ~re.IGNORECASE)
+
+def _phrases_can_overlap(phrases):
+    """Check whether occurrences of two alternatives of a pattern can start together or share a word"""
+    word_lists = [phrase.split(' ') for phrase in phrases]
+    for first in word_lists:
+        for second in word_lists:
+            for offset in range(len(first)):
+                if offset == 0 and first is second:
+                    continue
+                shared = first[offset:offset + len(second)]
+                if shared == second[:len(shared)]:
+                    return True
+    return False
+
+def _split_density_patterns():
+    """Split each indicator's patterns into literal phrases for the automaton and the remaining regexes.
+    
+    Whole-word alternatives that can never overlap match exactly where they occur
+    between word boundaries, so counting their occurrences gives the regex counts.
+    """
+    literal_phrases = {}
+    residual_res = {}
+    for indicator, patterns in _DENSITY_PATTERNS.items():
+        literal_phrases[indicator] = []
+        residual_res[indicator] = []
+        for pattern in patterns:
+            literal_match = _LITERAL_DENSITY_PATTERN_RE.fullmatch(pattern)
+            phrases = literal_match.group(1).lower().split('|') if literal_match else None
+            if phrases and all(all(phrase.split(' ')) for phrase in phrases) and not _phrases_can_overlap(phrases):
+                literal_phrases[indicator].extend(phrases)
+            else:
+                residual_res[indicator].append(re.compile(pattern, re.IGNORECASE))
+    return literal_phrases, residual_res
+
+def _build_density_automaton(literal_phrases):
+    """Build an automaton mapping each literal phrase to its length and the indicators it counts for"""
+    phrase_indicators = {}
+    for indicator, phrases in literal_phrases.items():
+        for phrase in phrases:
+            phrase_indicators.setdefault(phrase, []).append(indicator)
+    
+    automaton = ahocorasick.Automaton()
+    for phrase, indicators in phrase_indicators.items():
+        automaton.add_word(phrase, (len(phrase), tuple(indicators)))
+    automaton.make_automaton()
+    return automaton
+
+_DENSITY_LITERAL_PHRASES, _DENSITY_RESIDUAL_RES = _split_density_patterns()
+_DENSITY_AUTOMATON = _build_density_automaton(_DENSITY_LITERAL_PHRASES) if ahocorasick is not None else None
+
+def _count_literal_matches(content):
+    """Count the literal density phrases of every indicator in one pass of the automaton.
+    
+    Returns None when the automaton is unavailable or the content holds a character
+    that lowercasing does not fold like case-insensitive matching.
+    """
+    if _DENSITY_AUTOMATON is None or CASE_FOLD_EXCEPTION_RE.search(content):
+        return None
+    
+    content_lower = content.lower()
+    content_length = len(content_lower)
+    counts = dict.fromkeys(_DENSITY_PATTERNS, 0)
+    for end_index, (phrase_length, indicators) in _DENSITY_AUTOMATON.iter(content_lower):
+        start = end_index - phrase_length + 1
+        if start > 0 and is_word_char(content_lower[start - 1]):
+            continue
+        if end_index + 1 < content_length and is_word_char(content_lower[end_index + 1]):
+            continue
+        for indicator in indicators:
+            counts[indicator] += 1
+    return counts
+
+# Information architecture patterns. Cross-references and conditional logic only need
+# to be present, so each is probed with one union of its patterns
+_CROSS_REFERENCE_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in (
+    r'\b(?:see|refer to|as mentioned in|described in)\s+(?:section|chapter|page)\b',
+    r'\b(?:above|below|earlier|later|previous|next)\s+(?:section|step|example)\b',
+    r'\b(?:Section|Chapter|Page)\s+\d+',
+    r'\b(?:Figure|Table|Example)\s+\d+'
+)), re.IGNORECASE)
+_CONDITIONAL_LOGIC_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in (
+    # A condition and its consequence on one line. The lookahead finds the line's first
+    # condition and the backreference commits to it like an atomic group, so a line is
+    # scanned once instead of once per condition without a consequence after it
+    r'^(?=(.*?\b(?:if|when|unless|should|in case)\b))\1.*\b(?:then|otherwise|else)\b',
+    r'\b(?:depending on|based on|according to)\b',
+    r'\b(?:alternatively|instead|or)\b'
+)), re.MULTILINE | re.IGNORECASE)
+_SEQUENTIAL_INDICATOR_RES = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'\b(?:first|second|third|next|then|finally|last)\b',
+    r'\b(?:before|after|once|when|until)\b',
+    r'\b(?:step|phase|stage)\s+\d+\b'
+)]
+
+# The same probes for content that lower() folds exactly like case-insensitive matching
+_CROSS_REFERENCE_LOWER_RE = _lowercase_pattern(_CROSS_REFERENCE_RE)
+_CONDITIONAL_LOGIC_LOWER_RE = _lowercase_pattern(_CONDITIONAL_LOGIC_RE)
+_SEQUENTIAL_INDICATOR_LOWER_RES = [_lowercase_pattern(pattern) for pattern in _SEQUENTIAL_INDICATOR_RES]
+_NUMBERED_STEP_RE = re.compile(r'^[^\S\n]*\d+\.\s+', re.MULTILINE)
+
+# Line starts that can deepen the hierarchy: an indentation of at least one level (4
+# spaces) before the line's text, and a numbering with at least one level separator
+_INDENTED_LINE_RE = re.compile(r'^([^\S\n]{4,})\S', re.MULTILINE)
+_NESTED_NUMBERING_RE = re.compile(r'^[^\S\n]*\d+((?:\.\d+)+)', re.MULTILINE)
+
+# Number of joined contents whose features a signature analyzer keeps, and their total
+# length in characters; a joined collection can be large, so both bound the cache
+_MAX_CACHED_FEATURES = 4096
+_MAX_CACHED_CONTENT_LENGTH = 16 * 1024 * 1024
+
+# Information architecture of content without any text
+_BLANK_ARCHITECTURE = {
+    'hierarchical_depth': 0,
+    'cross_references': False,
+    'conditional_logic': False,
+    'sequential_dependencies': False
+}
+
+def _build_pattern_set(patterns):
+    """Build an RE2 set of compiled patterns, returning it with the patterns it holds in set order"""
+    pattern_set = re2.Set.SearchSet()
+    set_patterns = []
+    for pattern in patterns:
+        flags = ('i' if pattern.flags & re.IGNORECASE else '') + ('m' if pattern.flags & re.MULTILINE else '')
+        try:
+            pattern_set.Add(f'(?{flags}){pattern.pattern}' if flags else pattern.pattern)
+        except re2.error:
+            # Syntax RE2 lacks, such as lookarounds; the pattern is always run
+            continue
+        set_patterns.append(pattern)
+    pattern_set.Compile()
+    return pattern_set, set_patterns
+
+def _has_matches(matches, minimum):
+    """Check for at least `minimum` matches, stopping the scan as soon as they are found"""
+    for match_count, _ in enumerate(matches, 1):
+        if match_count >= minimum:
+            return True
+    return False
+
 class EnhancedStructuralSignatures:
     def __init__(self):
         # Enhanced structural signatures based on information architecture patterns
@@ -14,19 +241,19 @@ class EnhancedStructuralSignatures:
                     'structural_patterns': {
                         # Form-related structural indicators
                         'field_creation_patterns': [
-                            r'^\s*\d+\.\s+(?:Select|Choose|Click).*(?:field|form|button)',
-                            r'^\s*\d+\.\s+(?:Add|Create|Insert).*(?:text|field|checkbox)',
-                            r'^\s*\d+\.\s+(?:Configure|Set up|Define).*(?:properties|options)'
+                            r'^[^\S\n]*\d+\.\s+(?:Select|Choose|Click).*?(?:field|form|button)',
+                            r'^[^\S\n]*\d+\.\s+(?:Add|Create|Insert).*?(?:text|field|checkbox)',
+                            r'^[^\S\n]*\d+\.\s+(?:Configure|Set up|Define).*?(?:properties|options)'
                         ],
                         'workflow_patterns': [
-                            r'^\s*\d+\.\s+(?:Send|Share|Distribute).*(?:document|form)',
-                            r'^\s*\d+\.\s+(?:Review|Approve|Sign).*(?:process|workflow)',
-                            r'^\s*\d+\.\s+(?:Collect|Gather|Manage).*(?:responses|data)'
+                            r'^[^\S\n]*\d+\.\s+(?:Send|Share|Distribute).*?(?:document|form)',
+                            r'^[^\S\n]*\d+\.\s+(?:Review|Approve|Sign).*?(?:process|workflow)',
+                            r'^[^\S\n]*\d+\.\s+(?:Collect|Gather|Manage).*?(?:responses|data)'
                         ],
                         'compliance_patterns': [
-                            r'^\s*\d+\.\s+(?:Enable|Set|Configure).*(?:security|permissions)',
-                            r'^\s*\d+\.\s+(?:Track|Monitor|Audit).*(?:access|changes)',
-                            r'^\s*\d+\.\s+(?:Archive|Store|Backup).*(?:records|documents)'
+                            r'^[^\S\n]*\d+\.\s+(?:Enable|Set|Configure).*?(?:security|permissions)',
+                            r'^[^\S\n]*\d+\.\s+(?:Track|Monitor|Audit).*?(?:access|changes)',
+                            r'^[^\S\n]*\d+\.\s+(?:Archive|Store|Backup).*?(?:records|documents)'
                         ]
                     },
                     'information_architecture': {
@@ -47,19 +274,19 @@ class EnhancedStructuralSignatures:
                 'plan_group_trip': {
                     'structural_patterns': {
                         'itinerary_patterns': [
-                            r'^\s*(?:Day\s+\d+|Morning|Afternoon|Evening)',
-                            r'^\s*\d+:\d+\s*(?:AM|PM)?',
-                            r'^\s*\d+\.\s+(?:Visit|Go to|Explore).*(?:at|in|near)'
+                            r'^[^\S\n]*(?:Day\s+\d+|Morning|Afternoon|Evening)',
+                            r'^[^\S\n]*\d+:\d+\s*(?:AM|PM)?',
+                            r'^[^\S\n]*\d+\.\s+(?:Visit|Go to|Explore).*?(?:at|in|near)'
                         ],
                         'logistics_patterns': [
-                            r'^\s*\d+\.\s+(?:Book|Reserve|Contact).*(?:hotel|restaurant)',
-                            r'^\s*\d+\.\s+(?:Check|Confirm|Verify).*(?:availability|booking)',
-                            r'^\s*\d+\.\s+(?:Meet|Gather|Depart).*(?:at|from)'
+                            r'^[^\S\n]*\d+\.\s+(?:Book|Reserve|Contact).*?(?:hotel|restaurant)',
+                            r'^[^\S\n]*\d+\.\s+(?:Check|Confirm|Verify).*?(?:availability|booking)',
+                            r'^[^\S\n]*\d+\.\s+(?:Meet|Gather|Depart).*?(?:at|from)'
                         ],
                         'resource_patterns': [
-                            r'^\s*\d+\.\s+(?:Budget|Cost|Price).*(?:per person|total)',
-                            r'^\s*\d+\.\s+(?:Pack|Bring|Prepare).*(?:for|before)',
-                            r'^\s*\d+\.\s+(?:Download|Get|Obtain).*(?:map|guide|tickets)'
+                            r'^[^\S\n]*\d+\.\s+(?:Budget|Cost|Price).*?(?:per person|total)',
+                            r'^[^\S\n]*\d+\.\s+(?:Pack|Bring|Prepare).*?(?:for|before)',
+                            r'^[^\S\n]*\d+\.\s+(?:Download|Get|Obtain).*?(?:map|guide|tickets)'
                         ]
                     },
                     'information_architecture': {
@@ -80,19 +307,19 @@ class EnhancedStructuralSignatures:
                 'learn_software_features': {
                     'structural_patterns': {
                         'tutorial_patterns': [
-                            r'^\s*\d+\.\s+(?:Open|Launch|Start).*(?:application|program)',
-                            r'^\s*\d+\.\s+(?:Navigate to|Go to|Find).*(?:menu|toolbar|panel)',
-                            r'^\s*\d+\.\s+(?:Follow|Complete|Practice).*(?:steps|exercise)'
+                            r'^[^\S\n]*\d+\.\s+(?:Open|Launch|Start).*?(?:application|program)',
+                            r'^[^\S\n]*\d+\.\s+(?:Navigate to|Go to|Find).*?(?:menu|toolbar|panel)',
+                            r'^[^\S\n]*\d+\.\s+(?:Follow|Complete|Practice).*?(?:steps|exercise)'
                         ],
                         'feature_patterns': [
-                            r'^\s*\d+\.\s+(?:Use|Try|Apply).*(?:tool|feature|function)',
-                            r'^\s*\d+\.\s+(?:Customize|Adjust|Modify).*(?:settings|preferences)',
-                            r'^\s*\d+\.\s+(?:Save|Export|Share).*(?:work|document|file)'
+                            r'^[^\S\n]*\d+\.\s+(?:Use|Try|Apply).*?(?:tool|feature|function)',
+                            r'^[^\S\n]*\d+\.\s+(?:Customize|Adjust|Modify).*?(?:settings|preferences)',
+                            r'^[^\S\n]*\d+\.\s+(?:Save|Export|Share).*?(?:work|document|file)'
                         ],
                         'troubleshooting_patterns': [
-                            r'^\s*\d+\.\s+(?:If|When|Should).*(?:error|problem|issue)',
-                            r'^\s*\d+\.\s+(?:Check|Verify|Ensure).*(?:that|if)',
-                            r'^\s*\d+\.\s+(?:Try|Attempt|Consider).*(?:alternative|different)'
+                            r'^[^\S\n]*\d+\.\s+(?:If|When|Should).*?(?:error|problem|issue)',
+                            r'^[^\S\n]*\d+\.\s+(?:Check|Verify|Ensure).*?(?:that|if)',
+                            r'^[^\S\n]*\d+\.\s+(?:Try|Attempt|Consider).*?(?:alternative|different)'
                         ]
                     },
                     'information_architecture': {
@@ -110,26 +337,156 @@ class EnhancedStructuralSignatures:
                 }
             }
         }
+        
+        # Signatures by (persona category, job category), resolved with a single lookup
+        self.signatures_by_pair = {
+            (persona_category, job_category): signature
+            for persona_category, job_signatures in self.enhanced_signatures.items()
+            for job_category, signature in job_signatures.items()
+        }
+        
+        # Compiled structural patterns of the signatures, by pattern string
+        self.compiled_patterns = {
+            pattern: re.compile(pattern, re.MULTILINE | re.IGNORECASE)
+            for job_signatures in self.enhanced_signatures.values()
+            for signature in job_signatures.values()
+            for patterns in signature['structural_patterns'].values()
+            for pattern in patterns
+        }
+        
+        # RE2 set of the structural and residual density patterns, which are counted only
+        # when the set finds a match for them
+        self.pattern_set, self.set_patterns = self.build_pattern_set()
+        
+        # Features of the contents analyzed so far, by joined content; the same blocks
+        # are typically analyzed again for other persona-job combinations
+        self.content_features = {}
+        self.cached_content_length = 0
+    
+    def __getstate__(self):
+        """Leave out the RE2 set, which cannot be pickled, e.g. for a worker process"""
+        state = self.__dict__.copy()
+        state['pattern_set'] = None
+        state['set_patterns'] = []
+        return state
+    
+    def __setstate__(self, state):
+        """Restore the state and rebuild the RE2 set left out by __getstate__"""
+        self.__dict__.update(state)
+        self.pattern_set, self.set_patterns = self.build_pattern_set()
+    
+    def build_pattern_set(self):
+        """Build the RE2 set of the structural and residual density patterns, or (None, []) without google-re2"""
+        if re2 is None:
+            return None, []
+        return _build_pattern_set(chain(self.compiled_patterns.values(), *_DENSITY_RESIDUAL_RES.values()))
     
     def analyze_structural_signature(self, content_blocks, persona_category, job_category):
         """Analyze content blocks against enhanced structural signatures"""
         
-        if persona_category not in self.enhanced_signatures:
+        signature = self.get_signature(persona_category, job_category)
+        if signature is None:
             return 0.0
         
-        if job_category not in self.enhanced_signatures[persona_category]:
+        # The blocks are joined on every call to look up their features, with dict.get
+        # bound once rather than looked up on each block
+        get_value = dict.get
+        all_content = '\n'.join([get_value(block, 'content', '') for block in content_blocks])
+        
+        features = self.content_features.get(all_content)
+        if features is None:
+            features = self.precompute_block_features(content_blocks, all_content)
+            if len(all_content) <= _MAX_CACHED_CONTENT_LENGTH:
+                # Forget the contents analyzed first until the new one fits
+                while (len(self.content_features) >= _MAX_CACHED_FEATURES or
+                       self.cached_content_length + len(all_content) > _MAX_CACHED_CONTENT_LENGTH):
+                    oldest_content = next(iter(self.content_features))
+                    del self.content_features[oldest_content]
+                    self.cached_content_length -= len(oldest_content)
+                self.content_features[all_content] = features
+                self.cached_content_length += len(all_content)
+        
+        return self.score_signature(features, signature)
+    
+    def get_signature(self, persona_category, job_category):
+        """Get the enhanced structural signature of a persona-job combination, or None if there is none"""
+        return self.signatures_by_pair.get((persona_category, job_category))
+    
+    def precompute_block_features(self, content_blocks, all_content=None, word_count=None):
+        """Compute the signature-independent features of content blocks once, for scoring against any signature.
+        
+        Blocks are joined on newlines, so no word spans two blocks and a known total of
+        their word counts can be passed as `word_count` instead of splitting the content.
+        """
+        if all_content is None:
+            all_content = '\n'.join([block.get('content', '') for block in content_blocks])
+        
+        if not all_content or all_content.isspace():
+            # Blank content (e.g. an empty page) has no words and matches no pattern,
+            # so its features are known without scanning it
+            return {
+                'content': all_content,
+                'word_count': 0 if word_count is None else word_count,
+                'architecture': dict(_BLANK_ARCHITECTURE),
+                'literal_counts': dict.fromkeys(_DENSITY_PATTERNS, 0),
+                'matched_patterns': dict.fromkeys(self.set_patterns, False),
+                'pattern_matches': {},
+                'indicator_densities': {}
+            }
+        
+        if word_count is None:
+            word_count = len(all_content.split())
+        
+        return {
+            'content': all_content,
+            'word_count': word_count,
+            'architecture': self.analyze_information_architecture(content_blocks, all_content),
+            'literal_counts': _count_literal_matches(all_content),
+            'matched_patterns': self.match_pattern_set(all_content),
+            # Pattern match counts and indicator densities are filled in as signatures use them
+            'pattern_matches': {},
+            'indicator_densities': {}
+        }
+    
+    def match_pattern_set(self, all_content):
+        """Tell for each pattern of the RE2 set whether it matches the content, in one scan.
+        
+        Returns None when google-re2 is unavailable or the content holds a character
+        that RE2 matches differently.
+        """
+        if self.pattern_set is None or RE2_MISMATCH_CHAR_RE.search(all_content):
+            return None
+        
+        matched_patterns = dict.fromkeys(self.set_patterns, False)
+        for index in self.pattern_set.Match(all_content) or ():
+            matched_patterns[self.set_patterns[index]] = True
+        return matched_patterns
+    
+    def score_from_features(self, features, persona_category, job_category):
+        """Score precomputed block features against an enhanced structural signature"""
+        
+        signature = self.get_signature(persona_category, job_category)
+        if signature is None:
             return 0.0
         
-        signature = self.enhanced_signatures[persona_category][job_category]
+        return self.score_signature(features, signature)
+    
+    def score_signature(self, features, signature):
+        """Score precomputed block features against a resolved signature"""
         
         # Analyze structural patterns
-        pattern_score = self.calculate_pattern_match_score(content_blocks, signature['structural_patterns'])
+        pattern_score = self.score_pattern_matches(
+            features['content'], signature['structural_patterns'], features['pattern_matches'], features['matched_patterns']
+        )
         
         # Analyze information architecture
-        architecture_score = self.calculate_architecture_score(content_blocks, signature['information_architecture'])
+        architecture_score = self.score_architecture(features['architecture'], signature['information_architecture'])
         
         # Analyze content density
-        density_score = self.calculate_density_score(content_blocks, signature['content_density_indicators'])
+        density_score = self.score_density(
+            features['content'], features['word_count'], signature['content_density_indicators'], features['indicator_densities'],
+            features['literal_counts'], features['matched_patterns']
+        )
         
         # Weighted combination
         final_score = (pattern_score * 0.4) + (architecture_score * 0.3) + (density_score * 0.3)
@@ -138,17 +495,23 @@ class EnhancedStructuralSignatures:
     
     def calculate_pattern_match_score(self, content_blocks, structural_patterns):
         """Calculate how well content matches structural patterns"""
+        all_content = '\n'.join([block.get('content', '') for block in content_blocks])
+        
+        return self.score_pattern_matches(all_content, structural_patterns, {})
+    
+    def score_pattern_matches(self, all_content, structural_patterns, pattern_matches, matched_patterns=None):
+        """Pattern match score of joined content, counting each pattern once into `pattern_matches`"""
         total_score = 0.0
         total_patterns = 0
         
-        all_content = '\n'.join([block.get('content', '') for block in content_blocks])
-        
         for pattern_category, patterns in structural_patterns.items():
             category_score = 0.0
             
+            if any(pattern not in pattern_matches for pattern in patterns):
+                self.count_pattern_matches(all_content, patterns, pattern_matches, matched_patterns)
+            
             for pattern in patterns:
-                import re
-                matches = len(re.findall(pattern, all_content, re.MULTILINE | re.IGNORECASE))
+                matches = pattern_matches[pattern]
                 if matches > 0:
                     category_score += min(matches / 10.0, 1.0)  # Normalize to 0-1
             
@@ -159,30 +522,75 @@ class EnhancedStructuralSignatures:
         
         return total_score / total_patterns if total_patterns > 0 else 0.0
     
+    def count_pattern_matches(self, all_content, patterns, pattern_matches, matched_patterns=None):
+        """Count the matches of a category's patterns into `pattern_matches`, in one scan when none of them matches"""
+        compiled_patterns = [self.compiled_pattern(pattern) for pattern in patterns]
+        if matched_patterns is not None and all(compiled in matched_patterns for compiled in compiled_patterns):
+            # The RE2 set already found which of the patterns match
+            for pattern, compiled in zip(patterns, compiled_patterns):
+                if pattern not in pattern_matches:
+                    pattern_matches[pattern] = len(compiled.findall(all_content)) if matched_patterns[compiled] else 0
+            return
+        
+        # The union of the patterns finds a match exactly when one of them does
+        union = '|'.join(f'(?:{pattern})' for pattern in patterns)
+        has_matches = self.compiled_pattern(union).search(all_content) is not None
+        
+        for pattern in patterns:
+            if pattern not in pattern_matches:
+                pattern_matches[pattern] = len(self.compiled_pattern(pattern).findall(all_content)) if has_matches else 0
+    
+    def compiled_pattern(self, pattern):
+        """Compiled form of a structural pattern, compiling patterns added after initialization on first use"""
+        compiled = self.compiled_patterns.get(pattern)
+        if compiled is None:
+            compiled = self.compiled_patterns[pattern] = re.compile(pattern, re.MULTILINE | re.IGNORECASE)
+        return compiled
+    
     def calculate_architecture_score(self, content_blocks, architecture_requirements):
         """Calculate information architecture alignment score"""
+        return self.score_architecture(self.analyze_information_architecture(content_blocks), architecture_requirements)
+    
+    def analyze_information_architecture(self, content_blocks, all_content=None):
+        """Detect the information architecture features of content blocks, sharing their joined content between the detectors"""
+        if all_content is None:
+            all_content = '\n'.join([block.get('content', '') for block in content_blocks])
+        
+        # The keyword probes run on the content lowercased once, unless it holds a character
+        # that lower() folds differently from case-insensitive matching
+        content_lower = None if CASE_FOLD_EXCEPTION_RE.search(all_content) else all_content.lower()
+        
+        return {
+            'hierarchical_depth': self.analyze_hierarchical_depth(content_blocks, all_content),
+            'cross_references': self.detect_cross_references(content_blocks, all_content, content_lower),
+            'conditional_logic': self.detect_conditional_logic(content_blocks, all_content, content_lower),
+            'sequential_dependencies': self.detect_sequential_dependencies(content_blocks, all_content, content_lower)
+        }
+    
+    def score_architecture(self, architecture, architecture_requirements):
+        """Score detected architecture features against the requirements of a signature"""
         score = 0.0
         
         # Analyze hierarchical depth
-        max_depth = self.analyze_hierarchical_depth(content_blocks)
+        max_depth = architecture['hierarchical_depth']
         required_depth = architecture_requirements.get('hierarchical_depth', 2)
         depth_score = min(max_depth / required_depth, 1.0)
         score += depth_score * 0.3
         
         # Analyze cross-references
-        has_cross_refs = self.detect_cross_references(content_blocks)
+        has_cross_refs = architecture['cross_references']
         requires_cross_refs = architecture_requirements.get('cross_references', False)
         if has_cross_refs == requires_cross_refs:
             score += 0.2
         
         # Analyze conditional logic
-        has_conditional = self.detect_conditional_logic(content_blocks)
+        has_conditional = architecture['conditional_logic']
         requires_conditional = architecture_requirements.get('conditional_logic', False)
         if has_conditional == requires_conditional:
             score += 0.2
         
         # Analyze sequential dependencies
-        has_sequential = self.detect_sequential_dependencies(content_blocks)
+        has_sequential = architecture['sequential_dependencies']
         requires_sequential = architecture_requirements.get('sequential_dependencies', True)
         if has_sequential == requires_sequential:
             score += 0.3
@@ -191,173 +599,115 @@ class EnhancedStructuralSignatures:
     
     def calculate_density_score(self, content_blocks, density_indicators):
         """Calculate content density alignment score"""
+        all_content = '\n'.join([block.get('content', '') for block in content_blocks])
+        
+        return self.score_density(all_content, len(all_content.split()), density_indicators, {})
+    
+    def score_density(self, all_content, word_count, density_indicators, indicator_densities, literal_counts=None,
+                      matched_patterns=None):
+        """Density alignment score of joined content, computing each indicator once into `indicator_densities`"""
         score = 0.0
         total_indicators = len(density_indicators)
         
         if total_indicators == 0:
             return 0.0
         
-        all_content = '\n'.join([block.get('content', '') for block in content_blocks])
-        word_count = len(all_content.split())
-        
         if word_count == 0:
             return 0.0
         
         for indicator, expected_density in density_indicators.items():
-            actual_density = self.calculate_specific_density(all_content, indicator, word_count)
+            if indicator not in indicator_densities:
+                indicator_densities[indicator] = self.calculate_specific_density(
+                    all_content, indicator, word_count, literal_counts, matched_patterns
+                )
+            actual_density = indicator_densities[indicator]
             
-            # Score based on how close actual density is to expected
+            # Score based on how close actual density is to expected, clamped at 0
+            # without a builtin call per indicator
             density_diff = abs(actual_density - expected_density)
-            indicator_score = max(0, 1.0 - (density_diff * 2))  # Penalty for deviation
-            score += indicator_score
+            indicator_score = 1.0 - (density_diff * 2)  # Penalty for deviation
+            if indicator_score > 0:
+                score += indicator_score
         
         return score / total_indicators
     
-    def calculate_specific_density(self, content, indicator_type, word_count):
-        """Calculate density for specific indicator types"""
-        import re
-        
-        density_patterns = {
-            'ui_element_references': [
-                r'\b(?:button|menu|toolbar|panel|dialog|window|field|checkbox|dropdown)\b',
-                r'\b(?:click|select|choose|press|drag|drop|hover)\b',
-                r'\b(?:All tools|File menu|Edit menu|View menu)\b'
-            ],
-            'action_verb_density': [
-                r'\b(?:create|make|build|generate|produce)\b',
-                r'\b(?:edit|modify|change|update|revise)\b',
-                r'\b(?:save|export|share|send|distribute)\b'
-            ],
-            'location_density': [
-                r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*(?:\s+(?:Street|Avenue|Hotel|Restaurant|Museum))\b',
-                r'\b(?:address|location|place|venue|destination)\b'
-            ],
-            'time_density': [
-                r'\b\d{1,2}:\d{2}(?:\s*[AP]M)?\b',
-                r'\b(?:morning|afternoon|evening|night|day|hour|minute)\b',
-                r'\b(?:Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)\b'
-            ],
-            'contact_density': [
-                r'\b(?:phone|email|website|contact|address)\b',
-                r'\b(?:www\.|http|@[\w.-]+|\+?\d{1,3}[-.\s]?\d{1,4})\b'
-            ],
-            'price_density': [
-                r'\b(?:€|$|£)\s*\d+(?:\.\d{2})?\b',
-                r'\b\d+(?:\.\d{2})?\s*(?:euros?|dollars?|pounds?)\b',
-                r'\b(?:cost|price|fee|budget|expense)\b'
-            ],
-            'technical_specificity': [
-                r'\b(?:configure|parameter|setting|option|property)\b',
-                r'\b(?:database|server|client|API|URL|XML|JSON)\b'
-            ],
-            'process_complexity': [
-                r'\b(?:workflow|process|procedure|protocol|methodology)\b',
-                r'\b(?:step|phase|stage|sequence|order)\b'
-            ],
-            'learning_progression': [
-                r'\b(?:beginner|intermediate|advanced|basic|complex)\b',
-                r'\b(?:learn|practice|master|understand|explore)\b'
-            ],
-            'example_density': [
-                r'\b(?:example|sample|illustration|demonstration)\b',
-                r'\b(?:for instance|such as|like|including)\b'
-            ]
-        }
+    def calculate_specific_density(self, content, indicator_type, word_count, literal_counts=None, matched_patterns=None):
+        """Calculate density for specific indicator types, given the literal phrase counts and RE2 set matches of the content when known"""
+        if indicator_type not in _DENSITY_RES:
+            return 0.0
+        
+        if literal_counts is None:
+            literal_counts = _count_literal_matches(content)
+        
+        if literal_counts is not None:
+            # Literal phrases come from the automaton pass; only the other patterns are run
+            total_matches = literal_counts[indicator_type]
+            for pattern in _DENSITY_RESIDUAL_RES[indicator_type]:
+                if matched_patterns is None or matched_patterns.get(pattern, True):
+                    total_matches += len(pattern.findall(content))
+            
+            return total_matches / word_count if word_count > 0 else 0.0
         
-        if indicator_type not in density_patterns:
+        if _DENSITY_UNION_RES[indicator_type].search(content) is None:
             return 0.0
         
         total_matches = 0
-        for pattern in density_patterns[indicator_type]:
-            matches = len(re.findall(pattern, content, re.IGNORECASE))
+        for pattern in _DENSITY_RES[indicator_type]:
+            matches = len(pattern.findall(content))
             total_matches += matches
         
         return total_matches / word_count if word_count > 0 else 0.0
     
-    def analyze_hierarchical_depth(self, content_blocks):
+    def analyze_hierarchical_depth(self, content_blocks, all_content=None):
         """Analyze the hierarchical depth of content structure"""
-        max_depth = 0
+        if all_content is None:
+            all_content = '\n'.join([block.get('content', '') for block in content_blocks])
         
-        for block in content_blocks:
-            content = block.get('content', '')
-            lines = content.split('\n')
-            
-            for line in lines:
-                # Count indentation levels
-                stripped = line.lstrip()
-                if stripped:
-                    indent_level = len(line) - len(stripped)
-                    depth = indent_level // 4  # Assume 4 spaces per level
-                    max_depth = max(max_depth, depth)
-                
-                # Count numbered list depth (1.1.1 format)
-                import re
-                numbered_match = re.match(r'^(\d+(?:\.\d+)*)', stripped)
-                if numbered_match:
-                    depth = numbered_match.group(1).count('.')
-                    max_depth = max(max_depth, depth)
+        # Count indentation levels of the lines with text
+        indent_level = max((len(indentation) for indentation in _INDENTED_LINE_RE.findall(all_content)), default=0)
+        max_depth = indent_level // 4  # Assume 4 spaces per level
+        
+        # Count numbered list depth (1.1.1 format)
+        for separators in _NESTED_NUMBERING_RE.findall(all_content):
+            max_depth = max(max_depth, separators.count('.'))
         
         return max_depth
     
-    def detect_cross_references(self, content_blocks):
+    def detect_cross_references(self, content_blocks, all_content=None, content_lower=None):
         """Detect cross-references to other sections"""
-        import re
-        
-        all_content = '\n'.join([block.get('content', '') for block in content_blocks])
-        
-        cross_ref_patterns = [
-            r'\b(?:see|refer to|as mentioned in|described in)\s+(?:section|chapter|page)\b',
-            r'\b(?:above|below|earlier|later|previous|next)\s+(?:section|step|example)\b',
-            r'\b(?:Section|Chapter|Page)\s+\d+',
-            r'\b(?:Figure|Table|Example)\s+\d+'
-        ]
+        if content_lower is not None:
+            return _CROSS_REFERENCE_LOWER_RE.search(content_lower) is not None
         
-        for pattern in cross_ref_patterns:
-            if re.search(pattern, all_content, re.IGNORECASE):
-                return True
+        if all_content is None:
+            all_content = '\n'.join([block.get('content', '') for block in content_blocks])
         
-        return False
+        return _CROSS_REFERENCE_RE.search(all_content) is not None
     
-    def detect_conditional_logic(self, content_blocks):
+    def detect_conditional_logic(self, content_blocks, all_content=None, content_lower=None):
         """Detect conditional logic patterns"""
-        import re
+        if content_lower is not None:
+            return _CONDITIONAL_LOGIC_LOWER_RE.search(content_lower) is not None
         
-        all_content = '\n'.join([block.get('content', '') for block in content_blocks])
-        
-        conditional_patterns = [
-            r'\b(?:if|when|unless|should|in case)\b.*\b(?:then|otherwise|else)\b',
-            r'\b(?:depending on|based on|according to)\b',
-            r'\b(?:alternatively|instead|or)\b'
-        ]
-        
-        for pattern in conditional_patterns:
-            if re.search(pattern, all_content, re.IGNORECASE):
-                return True
+        if all_content is None:
+            all_content = '\n'.join([block.get('content', '') for block in content_blocks])
         
-        return False
+        return _CONDITIONAL_LOGIC_RE.search(all_content) is not None
     
-    def detect_sequential_dependencies(self, content_blocks):
+    def detect_sequential_dependencies(self, content_blocks, all_content=None, content_lower=None):
         """Detect sequential dependencies between steps"""
-        import re
-        
-        all_content = '\n'.join([block.get('content', '') for block in content_blocks])
-        
-        # Look for numbered sequences
-        numbered_steps = len(re.findall(r'^\s*\d+\.\s+', all_content, re.MULTILINE))
-        
-        # Look for sequential indicators
-        sequential_patterns = [
-            r'\b(?:first|second|third|next|then|finally|last)\b',
-            r'\b(?:before|after|once|when|until)\b',
-            r'\b(?:step|phase|stage)\s+\d+\b'
-        ]
-        
-        sequential_indicators = 0
-        for pattern in sequential_patterns:
-            sequential_indicators += len(re.findall(pattern, all_content, re.IGNORECASE))
-        
-        # Consider it sequential if there are numbered steps or multiple sequential indicators
-        return numbered_steps >= 3 or sequential_indicators >= 5
+        if content_lower is not None:
+            content, indicator_patterns = content_lower, _SEQUENTIAL_INDICATOR_LOWER_RES
+        else:
+            if all_content is None:
+                all_content = '\n'.join([block.get('content', '') for block in content_blocks])
+            content, indicator_patterns = all_content, _SEQUENTIAL_INDICATOR_RES
+        
+        # Consider it sequential if there are numbered steps or multiple sequential indicators,
+        # scanning only until enough of either are found
+        return (
+            _has_matches(_NUMBERED_STEP_RE.finditer(content), 3) or
+            _has_matches(chain.from_iterable(pattern.finditer(content) for pattern in indicator_patterns), 5)
+        )
 
 def test_enhanced_signatures():
     """Test the enhanced structural signatures"""
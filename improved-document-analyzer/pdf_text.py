@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+"""
+PDF page text extraction shared by the analyzers and scripts
+"""
+
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+import PyPDF2
+
+# PDFium-based extraction is much faster than PyPDF2's pure-Python parser;
+# PyPDF2 remains the fallback when pypdfium2 is not installed
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+def _pdfium_page_text(page) -> str:
+    """Extract the text of a PDFium page and release the page"""
+    textpage = page.get_textpage()
+    try:
+        return textpage.get_text_bounded().replace('\r\n', '\n')
+    finally:
+        textpage.close()
+        page.close()
+
+@contextmanager
+def open_page_texts(pdf_path):
+    """Open a PDF document and yield its page count with a lazy iterator over the page texts"""
+    if pdfium is not None:
+        pdf = pdfium.PdfDocument(str(pdf_path))
+        try:
+            yield len(pdf), (_pdfium_page_text(pdf[page_index]) for page_index in range(len(pdf)))
+        finally:
+            pdf.close()
+    else:
+        with open(pdf_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            yield len(pdf_reader.pages), (page.extract_text() for page in pdf_reader.pages)
+
+def extract_page_texts(pdf_path) -> Tuple[List[str], Optional[str]]:
+    """Extract the text of every page of a PDF, with the error message that stopped it early (if any)"""
+    page_texts = []
+    try:
+        with open_page_texts(pdf_path) as (_, pages):
+            page_texts.extend(pages)
+    except Exception as e:
+        # The message rather than the exception is returned, as not every exception
+        # can be sent back from a worker process
+        return page_texts, str(e)
+    return page_texts, None
@@ -5,6 +5,25 @@ import os
 import json
 from pathlib import Path
 
+# Optional native JSON encoder for the results file; the json module writes the
+# same document without orjson
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Title keywords of Adobe procedural steps, Adobe features by the keyword that reveals
+# them in a subsection, and the keywords of Adobe-relevant results
+_ADOBE_ACTION_KEYWORDS = ('select', 'click', 'form', 'sign', 'share', 'create')
+_ADOBE_FEATURE_KEYWORDS = (
+    ('select', 'UI Selection'),
+    ('click', 'User Action'),
+    ('form', 'Form Management'),
+    ('sign', 'E-signature'),
+    ('share', 'Collaboration')
+)
+_ADOBE_KEYWORDS = ('acrobat', 'pdf', 'form', 'sign', 'share', 'create', 'edit', 'export')
+
 # Add the parent directory to the path
 sys.path.append(str(Path(__file__).parent.parent))
 
@@ -64,8 +83,13 @@ def run_corrected_analysis():
         
         # Save results
         output_file = output_dir / "corrected_adobe_results.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            # orjson encodes straight to UTF-8 bytes, so the file is written in binary mode
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2, ensure_ascii=False)
         
         print(f"✅ Analysis complete! Results saved to {output_file}")
         
@@ -87,7 +111,8 @@ def run_corrected_analysis():
             print(f"   📄 Page: {section['page_number']}")
             
             # Show more context for Adobe-specific content
-            if any(keyword in section['section_title'].lower() for keyword in ['select', 'click', 'form', 'sign', 'share', 'create']):
+            title_lower = section['section_title'].lower()
+            if any(keyword in title_lower for keyword in _ADOBE_ACTION_KEYWORDS):
                 print(f"   🎯 Adobe Action: Detected procedural step")
             print()
         
@@ -102,12 +127,8 @@ def run_corrected_analysis():
                 text = subsection['refined_text']
                 
                 # Identify Adobe-specific actions
-                adobe_actions = []
-                if 'select' in text.lower(): adobe_actions.append('UI Selection')
-                if 'click' in text.lower(): adobe_actions.append('User Action')
-                if 'form' in text.lower(): adobe_actions.append('Form Management')
-                if 'sign' in text.lower(): adobe_actions.append('E-signature')
-                if 'share' in text.lower(): adobe_actions.append('Collaboration')
+                text_lower = text.lower()
+                adobe_actions = [feature for keyword, feature in _ADOBE_FEATURE_KEYWORDS if keyword in text_lower]
                 
                 if adobe_actions:
                     print(f"   🏷️  Adobe Features: {', '.join(adobe_actions)}")
@@ -118,12 +139,11 @@ def run_corrected_analysis():
                 print()
         
         # Analysis quality check
-        adobe_keywords = ['acrobat', 'pdf', 'form', 'sign', 'share', 'create', 'edit', 'export']
         total_content = ' '.join([section['section_title'] for section in result['extracted_sections']]).lower()
-        adobe_matches = sum(1 for keyword in adobe_keywords if keyword in total_content)
+        adobe_matches = sum(1 for keyword in _ADOBE_KEYWORDS if keyword in total_content)
         
         print(f"🎯 QUALITY CHECK:")
-        print(f"   Adobe-relevant keywords found: {adobe_matches}/{len(adobe_keywords)}")
+        print(f"   Adobe-relevant keywords found: {adobe_matches}/{len(_ADOBE_KEYWORDS)}")
         if adobe_matches >= 4:
             print(f"   ✅ HIGH RELEVANCE: Results are well-matched to Adobe Acrobat content")
         elif adobe_matches >= 2:
@@ -6,38 +6,82 @@ import json
 from pathlib import Path
 import re
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 
 # Add the parent directory to the path so we can import the enhanced analyzer
 sys.path.append(str(Path(__file__).parent.parent))
 
+from text_matching import CASE_FOLD_EXCEPTION_RE
+
+# Document type signatures
+_ADOBE_INDICATOR_RES = tuple(re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in (
+    r'\b(?:Acrobat|Adobe|PDF)\b',
+    r'\b(?:Select|Click|Choose|Press)\b.*(?:tool|menu|button)\b',
+    r'\b(?:Create|Edit|Export|Share|Fill|Sign)\b.*(?:PDF|document|form)\b',
+    r'^\s*\d+\.\s+(?:Select|Click|Choose|Open)\b'
+))
+_TRAVEL_INDICATOR_RES = tuple(re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in (
+    r'\b(?:hotel|restaurant|museum|attraction|visit|tour)\b',
+    r'\b(?:€|$|£)\d+(?:\.\d{2})?',
+    r'\b(?:Day\s+\d+|Morning|Afternoon|Evening)\b',
+    r'\b(?:address|phone|hours|open|closed)\b'
+))
+_BUSINESS_INDICATOR_RES = tuple(re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in (
+    r'\b(?:revenue|profit|quarterly|annual|financial)\b',
+    r'\b\d+(?:\.\d+)?%',
+    r'\b(?:Q1|Q2|Q3|Q4|FY\d{4})\b'
+))
+
+# Adobe use case signatures
+_FORM_INDICATOR_RE = re.compile(r'\b(?:form|field|fillable|signature|workflow)\b', re.IGNORECASE)
+_COLLABORATION_INDICATOR_RE = re.compile(r'\b(?:share|collaborate|review|comment|approve)\b', re.IGNORECASE)
+_CREATION_INDICATOR_RE = re.compile(r'\b(?:create|convert|generate|export)\b', re.IGNORECASE)
+
+# A case-insensitive alternation of whole words matches exactly the words of the content
+# equal to one of them, so such indicators are counted from one tally of the content's
+# words instead of one scan each
+_WORD_ALTERNATION_PATTERN_RE = re.compile(r'\\b\(\?:([\w|]+)\)\\b')
+_WORD_RE = re.compile(r'\w+')
+
+def _alternation_words(pattern):
+    """Lowercased words of a case-insensitive whole-word alternation, or None for any other pattern"""
+    word_match = _WORD_ALTERNATION_PATTERN_RE.fullmatch(pattern.pattern)
+    if word_match is None or not pattern.flags & re.IGNORECASE:
+        return None
+    
+    words = word_match.group(1).lower().split('|')
+    return frozenset(words) if all(words) else None
+
+_INDICATOR_WORDS = {
+    pattern: _alternation_words(pattern)
+    for pattern in (
+        *_ADOBE_INDICATOR_RES, *_TRAVEL_INDICATOR_RES, *_BUSINESS_INDICATOR_RES,
+        _FORM_INDICATOR_RE, _COLLABORATION_INDICATOR_RE, _CREATION_INDICATOR_RE
+    )
+}
+
+def _count_indicator_matches(patterns, content, word_counts):
+    """Count the matches of indicator patterns, taking whole-word alternations from `word_counts` when given"""
+    match_count = 0
+    for pattern in patterns:
+        words = _INDICATOR_WORDS.get(pattern)
+        if words is not None and word_counts is not None:
+            match_count += sum(word_counts[word] for word in words)
+        else:
+            match_count += len(pattern.findall(content))
+    return match_count
+
 def auto_detect_optimal_persona_job(all_content: str):
     """Auto-detect optimal persona-job combination from content"""
     
-    # Document type signatures
-    adobe_indicators = [
-        r'\b(?:Acrobat|Adobe|PDF)\b',
-        r'\b(?:Select|Click|Choose|Press)\b.*(?:tool|menu|button)\b',
-        r'\b(?:Create|Edit|Export|Share|Fill|Sign)\b.*(?:PDF|document|form)\b',
-        r'^\s*\d+\.\s+(?:Select|Click|Choose|Open)\b'
-    ]
-    
-    travel_indicators = [
-        r'\b(?:hotel|restaurant|museum|attraction|visit|tour)\b',
-        r'\b(?:€|$|£)\d+(?:\.\d{2})?',
-        r'\b(?:Day\s+\d+|Morning|Afternoon|Evening)\b',
-        r'\b(?:address|phone|hours|open|closed)\b'
-    ]
-    
-    business_indicators = [
-        r'\b(?:revenue|profit|quarterly|annual|financial)\b',
-        r'\b\d+(?:\.\d+)?%',
-        r'\b(?:Q1|Q2|Q3|Q4|FY\d{4})\b'
-    ]
+    # Tally the lowercased words once, unless the content holds a character that lower()
+    # folds differently from case-insensitive matching
+    word_counts = None if CASE_FOLD_EXCEPTION_RE.search(all_content) else Counter(_WORD_RE.findall(all_content.lower()))
     
     # Count indicators
-    adobe_score = sum(len(re.findall(pattern, all_content, re.IGNORECASE | re.MULTILINE)) for pattern in adobe_indicators)
-    travel_score = sum(len(re.findall(pattern, all_content, re.IGNORECASE | re.MULTILINE)) for pattern in travel_indicators)
-    business_score = sum(len(re.findall(pattern, all_content, re.IGNORECASE | re.MULTILINE)) for pattern in business_indicators)
+    adobe_score = _count_indicator_matches(_ADOBE_INDICATOR_RES, all_content, word_counts)
+    travel_score = _count_indicator_matches(_TRAVEL_INDICATOR_RES, all_content, word_counts)
+    business_score = _count_indicator_matches(_BUSINESS_INDICATOR_RES, all_content, word_counts)
     
     print(f"🔍 Content Analysis Scores:")
     print(f"   Adobe/PDF: {adobe_score}")
@@ -49,9 +93,9 @@ def auto_detect_optimal_persona_job(all_content: str):
         # Adobe Acrobat content detected
         
         # Check for specific Adobe use cases
-        form_indicators = len(re.findall(r'\b(?:form|field|fillable|signature|workflow)\b', all_content, re.IGNORECASE))
-        collaboration_indicators = len(re.findall(r'\b(?:share|collaborate|review|comment|approve)\b', all_content, re.IGNORECASE))
-        creation_indicators = len(re.findall(r'\b(?:create|convert|generate|export)\b', all_content, re.IGNORECASE))
+        form_indicators = _count_indicator_matches((_FORM_INDICATOR_RE,), all_content, word_counts)
+        collaboration_indicators = _count_indicator_matches((_COLLABORATION_INDICATOR_RE,), all_content, word_counts)
+        creation_indicators = _count_indicator_matches((_CREATION_INDICATOR_RE,), all_content, word_counts)
         
         print(f"   Form-related: {form_indicators}")
         print(f"   Collaboration: {collaboration_indicators}")
@@ -97,22 +141,28 @@ def run_enhanced_auto_analysis():
     
     # Read all content for auto-detection
     print(f"\n🔍 Analyzing content for auto-detection...")
-    all_content = ""
+    # Page texts are collected and joined once, as appending each page to a growing
+    # string can copy the text read so far on every page
+    content_parts = []
     
     try:
-        import PyPDF2
+        from pdf_text import extract_page_texts
+        
+        # Text extraction is CPU-bound, so several files are extracted in a pool of
+        # worker processes; the results are still taken in file order
+        max_workers = min(os.cpu_count() or 1, len(pdf_files))
+        if max_workers > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                extracted_files = list(executor.map(extract_page_texts, pdf_files))
+        else:
+            extracted_files = [extract_page_texts(pdf_file) for pdf_file in pdf_files]
         
-        for pdf_file in pdf_files:
-            try:
-                with open(pdf_file, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    for page in pdf_reader.pages:
-                        page_text = page.extract_text()
-                        all_content += page_text + "\n"
-            except Exception as e:
-                print(f"⚠️  Error reading {pdf_file.name}: {e}")
-                continue
+        for pdf_file, (page_texts, error) in zip(pdf_files, extracted_files):
+            content_parts.extend(page_text + "\n" for page_text in page_texts)
+            if error is not None:
+                print(f"⚠️  Error reading {pdf_file.name}: {error}")
         
+        all_content = ''.join(content_parts)
         print(f"📄 Analyzed {len(all_content.split())} words total")
         
         # Auto-detect optimal persona and job
@@ -4,13 +4,64 @@ import sys
 import os
 import json
 from pathlib import Path
-import PyPDF2
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import re
 
+# Optional Aho-Corasick automaton that counts the content keywords of every category in
+# one pass; each keyword is counted separately without pyahocorasick
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # Add the parent directory to the path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from pdf_text import extract_page_texts
+
+# Keywords of each content category, counted in the lowercased collection text
+_CONTENT_KEYWORDS = {
+    'travel': ['travel', 'trip', 'visit', 'destination', 'hotel', 'restaurant', 'attraction', 'guide', 'tourism', 'vacation'],
+    'business': ['analysis', 'report', 'data', 'metrics', 'performance', 'revenue', 'profit', 'business'],
+    'cultural': ['culture', 'history', 'museum', 'art', 'heritage', 'tradition', 'historical', 'cultural'],
+    'technical': ['installation', 'setup', 'configuration', 'system', 'software', 'technical', 'manual']
+}
+
+def _build_keyword_automaton(category_keywords):
+    """Build an automaton mapping each keyword to itself, its length and the categories it counts for"""
+    keyword_categories = {}
+    for category, keywords in category_keywords.items():
+        for keyword in keywords:
+            keyword_categories.setdefault(keyword, []).append(category)
+    
+    automaton = ahocorasick.Automaton()
+    for keyword, categories in keyword_categories.items():
+        automaton.add_word(keyword, (keyword, len(keyword), tuple(categories)))
+    automaton.make_automaton()
+    return automaton
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton(_CONTENT_KEYWORDS) if ahocorasick is not None else None
+
+def count_category_keywords(content_lower: str) -> dict:
+    """Count the keyword occurrences of every content category, each keyword as str.count does"""
+    if _KEYWORD_AUTOMATON is None:
+        return {
+            category: sum(content_lower.count(keyword) for keyword in keywords)
+            for category, keywords in _CONTENT_KEYWORDS.items()
+        }
+    
+    counts = dict.fromkeys(_CONTENT_KEYWORDS, 0)
+    last_ends = {}
+    for end_index, (keyword, keyword_length, categories) in _KEYWORD_AUTOMATON.iter(content_lower):
+        # Like str.count, skip an occurrence overlapping the last counted one of its keyword
+        if end_index - keyword_length < last_ends.get(keyword, -1):
+            continue
+        last_ends[keyword] = end_index
+        for category in categories:
+            counts[category] += 1
+    return counts
+
 def diagnose_documents():
     """Diagnose the document collection to understand why personas/jobs might be empty"""
     
@@ -28,38 +79,45 @@ def diagnose_documents():
     
     print(f"📚 Analyzing {len(pdf_files)} documents...")
     
-    all_text = ""
+    all_page_texts = []
     all_structural_elements = defaultdict(int)
     document_analysis = {}
     
-    for pdf_file in pdf_files:
+    # Text extraction is CPU-bound, so several documents are extracted in a pool of
+    # worker processes; the results are still reported in document order
+    max_workers = min(os.cpu_count() or 1, len(pdf_files))
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            extracted_documents = list(executor.map(extract_page_texts, pdf_files))
+    else:
+        extracted_documents = [extract_page_texts(pdf_file) for pdf_file in pdf_files]
+    
+    for pdf_file, (page_texts, error) in zip(pdf_files, extracted_documents):
         print(f"\n📄 Analyzing: {pdf_file.name}")
+        all_page_texts.extend(page_texts)
+        
+        if error is not None:
+            print(f"  ❌ Error reading {pdf_file.name}: {error}")
+            continue
         
         try:
-            with open(pdf_file, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                doc_text = ""
-                
-                for page in pdf_reader.pages:
-                    page_text = page.extract_text()
-                    doc_text += page_text
-                    all_text += page_text
-                
-                # Analyze this document
-                doc_analysis = analyze_single_document(doc_text, pdf_file.name)
-                document_analysis[pdf_file.name] = doc_analysis
-                
-                # Aggregate structural elements
-                for element, count in doc_analysis['structural_elements'].items():
-                    all_structural_elements[element] += count
-                
-                print(f"  📊 Word count: {doc_analysis['word_count']}")
-                print(f"  🏗️  Top structural elements:")
-                top_elements = sorted(doc_analysis['structural_elements'].items(), 
-                                    key=lambda x: x[1], reverse=True)[:5]
-                for element, count in top_elements:
-                    if count > 0:
-                        print(f"    - {element}: {count}")
+            doc_text = ''.join(page_texts)
+            
+            # Analyze this document
+            doc_analysis = analyze_single_document(doc_text, pdf_file.name)
+            document_analysis[pdf_file.name] = doc_analysis
+            
+            # Aggregate structural elements
+            for element, count in doc_analysis['structural_elements'].items():
+                all_structural_elements[element] += count
+            
+            print(f"  📊 Word count: {doc_analysis['word_count']}")
+            print(f"  🏗️  Top structural elements:")
+            top_elements = sorted(doc_analysis['structural_elements'].items(), 
+                                key=lambda x: x[1], reverse=True)[:5]
+            for element, count in top_elements:
+                if count > 0:
+                    print(f"    - {element}: {count}")
         
         except Exception as e:
             print(f"  ❌ Error reading {pdf_file.name}: {e}")
@@ -69,6 +127,7 @@ def diagnose_documents():
     print("📊 COLLECTION ANALYSIS")
     print("=" * 60)
     
+    all_text = ''.join(all_page_texts)
     total_words = len(all_text.split())
     print(f"Total words across all documents: {total_words:,}")
     
@@ -82,25 +141,22 @@ def diagnose_documents():
     # Content analysis
     print(f"\n📝 CONTENT ANALYSIS:")
     content_lower = all_text.lower()
+    keyword_counts = count_category_keywords(content_lower)
     
     # Travel-related keywords
-    travel_keywords = ['travel', 'trip', 'visit', 'destination', 'hotel', 'restaurant', 'attraction', 'guide', 'tourism', 'vacation']
-    travel_count = sum(content_lower.count(keyword) for keyword in travel_keywords)
+    travel_count = keyword_counts['travel']
     print(f"  Travel-related terms: {travel_count}")
     
     # Business-related keywords
-    business_keywords = ['analysis', 'report', 'data', 'metrics', 'performance', 'revenue', 'profit', 'business']
-    business_count = sum(content_lower.count(keyword) for keyword in business_keywords)
+    business_count = keyword_counts['business']
     print(f"  Business-related terms: {business_count}")
     
     # Cultural keywords
-    cultural_keywords = ['culture', 'history', 'museum', 'art', 'heritage', 'tradition', 'historical', 'cultural']
-    cultural_count = sum(content_lower.count(keyword) for keyword in cultural_keywords)
+    cultural_count = keyword_counts['cultural']
     print(f"  Cultural-related terms: {cultural_count}")
     
     # Technical keywords
-    technical_keywords = ['installation', 'setup', 'configuration', 'system', 'software', 'technical', 'manual']
-    technical_count = sum(content_lower.count(keyword) for keyword in technical_keywords)
+    technical_count = keyword_counts['technical']
     print(f"  Technical-related terms: {technical_count}")
     
     # Recommendations
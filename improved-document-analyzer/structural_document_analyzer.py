@@ -1,12 +1,33 @@
 import json
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Any, Tuple
 import PyPDF2
 from collections import Counter, defaultdict
 import math
 
+# Section title patterns
+_TITLE_CAPITALIZED_WORD_RE = re.compile(r'\b[A-Z][a-z]+\b')
+_TITLE_NUMBER_RE = re.compile(r'\b\d+\b')
+_TITLE_LIST_MARKER_RE = re.compile(r'^\s*[•\-\*\+\d+\.\)]\s+')
+_TITLE_NUMBER_PREFIX_RE = re.compile(r'^\d+[\.\)]\s*')
+_TITLE_BULLET_PREFIX_RE = re.compile(r'^[•\-\*\+]\s*')
+
+# Analyzer of a document worker process, unpickled once by the pool initializer
+# instead of once per document
+_worker_analyzer = None
+
+def _init_document_worker(analyzer) -> None:
+    """Keep the analyzer a worker process analyzes its documents with"""
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+
+def _process_document_in_worker(pdf_path: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Extract the sections of one document with the worker's analyzer"""
+    return _worker_analyzer.process_single_document(pdf_path)
+
 class StructuralDocumentAnalyzer:
     def __init__(self):
         # Structural analysis weights for relevance scoring
@@ -85,6 +106,11 @@ class StructuralDocumentAnalyzer:
                 }
             }
         }
+        
+        # Signature keys of the persona and job strings normalized so far; the same
+        # strings are normalized again for every section of a collection
+        self.persona_keys = {}
+        self.job_keys = {}
 
     def analyze_document_collection(self, pdf_paths: List[str], persona: str, job: str) -> Dict[str, Any]:
         """Main analysis function that processes document collection"""
@@ -97,8 +123,17 @@ class StructuralDocumentAnalyzer:
         all_sections = []
         document_profiles = {}
         
-        for pdf_path in pdf_paths:
-            doc_sections, doc_profile = self.process_single_document(pdf_path)
+        # Documents are independent, so several of them are spread over a pool of worker
+        # processes, each of which receives the analyzer once and then takes one document
+        # at a time
+        max_workers = min(os.cpu_count() or 1, len(pdf_paths))
+        if max_workers > 1:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_document_worker, initargs=(self,)) as executor:
+                all_doc_results = list(executor.map(_process_document_in_worker, pdf_paths))
+        else:
+            all_doc_results = [self.process_single_document(pdf_path) for pdf_path in pdf_paths]
+        
+        for pdf_path, (doc_sections, doc_profile) in zip(pdf_paths, all_doc_results):
             all_sections.extend(doc_sections)
             document_profiles[os.path.basename(pdf_path)] = doc_profile
         
@@ -247,16 +282,16 @@ class StructuralDocumentAnalyzer:
             score = 0
             
             # Prefer lines with proper nouns (locations, names)
-            proper_nouns = len(re.findall(r'\b[A-Z][a-z]+\b', line_clean))
+            proper_nouns = len(_TITLE_CAPITALIZED_WORD_RE.findall(line_clean))
             score += proper_nouns * 2
             
             # Prefer lines with specific information
-            has_numbers = bool(re.search(r'\b\d+\b', line_clean))
+            has_numbers = bool(_TITLE_NUMBER_RE.search(line_clean))
             if has_numbers:
                 score += 1
             
             # Avoid list items as titles
-            if re.match(r'^\s*[•\-\*\+\d+\.\)]\s+', line_clean):
+            if _TITLE_LIST_MARKER_RE.match(line_clean):
                 score -= 3
             
             # Prefer medium-length lines
@@ -275,8 +310,8 @@ class StructuralDocumentAnalyzer:
             best_title = candidates[0][1]
             
             # Clean up the title
-            best_title = re.sub(r'^\d+[\.\)]\s*', '', best_title)
-            best_title = re.sub(r'^[•\-\*\+]\s*', '', best_title)
+            best_title = _TITLE_NUMBER_PREFIX_RE.sub('', best_title)
+            best_title = _TITLE_BULLET_PREFIX_RE.sub('', best_title)
             
             if len(best_title) > 80:
                 best_title = best_title[:77] + "..."
@@ -380,42 +415,38 @@ class StructuralDocumentAnalyzer:
         if not sections:
             return []
         
-        # Sort by start index
+        # Sort by start index, and compute each section's scores once: the quality sum
+        # of structural score and density, and the combined sum with organization
         sorted_sections = sorted(sections, key=lambda x: x['start_index'])
+        quality_scores = [section['structural_score'] + section['information_density'] for section in sorted_sections]
+        combined_scores = [quality_score + section['organization_score']
+                           for quality_score, section in zip(quality_scores, sorted_sections)]
         merged = []
         
-        current_section = sorted_sections[0]
+        current = 0
         
-        for next_section in sorted_sections[1:]:
+        for next_index in range(1, len(sorted_sections)):
             # Check for significant overlap
-            current_end = current_section['start_index'] + len(current_section['lines'])
-            overlap = max(0, current_end - next_section['start_index'])
+            current_lines = len(sorted_sections[current]['lines'])
+            current_end = sorted_sections[current]['start_index'] + current_lines
+            overlap = max(0, current_end - sorted_sections[next_index]['start_index'])
             
-            if overlap > len(current_section['lines']) * 0.4:  # 40% overlap
+            if overlap > current_lines * 0.4:  # 40% overlap
                 # Keep the section with higher combined score
-                current_combined = (current_section['structural_score'] + 
-                                  current_section['information_density'] + 
-                                  current_section['organization_score'])
-                next_combined = (next_section['structural_score'] + 
-                               next_section['information_density'] + 
-                               next_section['organization_score'])
-                
-                if next_combined > current_combined:
-                    current_section = next_section
+                if combined_scores[next_index] > combined_scores[current]:
+                    current = next_index
             else:
-                merged.append(current_section)
-                current_section = next_section
+                merged.append(current)
+                current = next_index
         
-        merged.append(current_section)
+        merged.append(current)
         
         # Filter by quality and limit number
-        quality_sections = [section for section in merged if 
-                          (section['structural_score'] + section['information_density']) > 0.3]
+        quality_indices = [index for index in merged if quality_scores[index] > 0.3]
         
         # Sort by combined quality score
-        quality_sections.sort(key=lambda x: (x['structural_score'] + 
-                                           x['information_density'] + 
-                                           x['organization_score']), reverse=True)
+        quality_indices.sort(key=combined_scores.__getitem__, reverse=True)
+        quality_sections = [sorted_sections[index] for index in quality_indices]
         
         return quality_sections[:15]  # Limit to top 15 per document
 
@@ -531,33 +562,45 @@ class StructuralDocumentAnalyzer:
 
     def normalize_persona(self, persona: str) -> str:
         """Normalize persona string to match our signatures"""
+        if persona in self.persona_keys:
+            return self.persona_keys[persona]
+        
         persona_lower = persona.lower()
         
         if any(word in persona_lower for word in ['travel', 'trip', 'planner', 'tourist']):
-            return 'travel_planner'
+            persona_key = 'travel_planner'
         elif any(word in persona_lower for word in ['cultural', 'culture', 'explorer', 'heritage']):
-            return 'cultural_explorer'
+            persona_key = 'cultural_explorer'
         elif any(word in persona_lower for word in ['food', 'culinary', 'cuisine', 'restaurant']):
-            return 'food_enthusiast'
+            persona_key = 'food_enthusiast'
+        else:
+            persona_key = 'travel_planner'  # Default fallback
         
-        return 'travel_planner'  # Default fallback
+        self.persona_keys[persona] = persona_key
+        return persona_key
 
     def normalize_job(self, job: str) -> str:
         """Normalize job string to match our signatures"""
+        if job in self.job_keys:
+            return self.job_keys[job]
+        
         job_lower = job.lower()
         
         if any(word in job_lower for word in ['plan', 'itinerary', 'schedule', 'trip']):
-            return 'plan_itinerary'
+            job_key = 'plan_itinerary'
         elif any(word in job_lower for word in ['accommodation', 'hotel', 'restaurant', 'dining']):
-            return 'find_accommodations'
+            job_key = 'find_accommodations'
         elif any(word in job_lower for word in ['activity', 'activities', 'things to do', 'attractions']):
-            return 'discover_activities'
+            job_key = 'discover_activities'
         elif any(word in job_lower for word in ['heritage', 'history', 'culture', 'museum']):
-            return 'explore_heritage'
+            job_key = 'explore_heritage'
         elif any(word in job_lower for word in ['cooking', 'recipe', 'culinary', 'learn']):
-            return 'learn_cooking'
+            job_key = 'learn_cooking'
+        else:
+            job_key = 'plan_itinerary'  # Default fallback
         
-        return 'plan_itinerary'  # Default fallback
+        self.job_keys[job] = job_key
+        return job_key
 
     def get_persona_job_signature(self, persona_key: str, job_key: str) -> Dict[str, Any]:
         """Get the structural signature for a persona-job combination"""
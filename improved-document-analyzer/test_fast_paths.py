@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+
+import random
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+# Add the current directory to the path
+sys.path.append(str(Path(__file__).parent))
+
+import auto_adaptive_analyzer
+import enhanced_structural_signatures
+import run_enhanced_auto_analysis
+from auto_adaptive_analyzer import AutoAdaptiveDocumentAnalyzer
+from enhanced_adaptive_analyzer import EnhancedAdaptiveDocumentAnalyzer
+from enhanced_structural_signatures import EnhancedStructuralSignatures
+
+# The Aho-Corasick, RE2 and lowercased-content paths must count exactly what the
+# stdlib re patterns count; each test runs a fast path against the plain re path
+# on the same texts. With an optional backend missing, its test compares the re
+# path with itself. The auto-adaptive counts are checked against case-insensitive
+# re scans of the original text, as the analyzer made them before lowercasing
+
+# Hand-written texts: ASCII, case folding exceptions (İ, ı, ſ, the Kelvin sign),
+# non-ASCII word characters and whitespace, overlapping span words, and multi-line
+# layouts
+SAMPLE_TEXTS = [
+    "Create a fillable form in Adobe Acrobat.\n1. Select Prepare a Form\n2. Click the Add Text Field tool\n3. Choose Export PDF",
+    "If the form has no fields, then add them manually; otherwise review the document.\nSee section 2 for details.",
+    "Share the PDF for review:\n• Send to multiple recipients\n• Track comments and approve changes\n  - set the due date",
+    "Day 1: visit the museum (€15) and the hotel restaurant\nAddress: 10 Main Street, open 9:30 am\nwww.example.com, 5 km away",
+    "FORM FIELDS AND SIGNATURES\nSİGN the form, then ſhare it with the team\nClıck Tools > Fill & Sign, then edıt the fıeld",
+    "Revenue grew 12% in Q3; profit\xa0rose and the quarterly report　is ready\nConfigure the ſettings then install",
+    "café formK field_name form_field formfield\nre-edit, e-sign, PDF/A: convert then export\n\n\nfinal step",
+    "create\nconvert\n generate\texport\fshare\rreview\vcomment\x0bapprove",
+    "Buildocument and sharefile, then exportdata and fixissue\nreviewdocument createform",
+    "Fİrst ſelect the Fİle menu, then preſs the button; ıf needed, ſcroll the panel\n    ſhould the dıalog open, type İnstall ſettings\nThe Fıle menu and Propertieſ panel",
+    "1. Clıck the ſign tool, then ſhare the PDF with the team\nCreate and edıt the form; ſave and export the document\nQuarterly profıt roſe 12%, see the hotel addreſs",
+    ""
+]
+
+# Tokens the random texts are made of, covering the indicator and keyword vocabularies
+TOKENS = [
+    'form', 'Form', 'FORM', 'forms', 'field', 'fields', 'fillable', 'signature', 'sign', 'Sign', 'workflow',
+    'create', 'Create', 'convert', 'generate', 'export', 'Export', 'edit', 'share', 'Share', 'review',
+    'collaborate', 'comment', 'approve', 'track', 'team', 'multiple users', 'recipients', 'send',
+    'select', 'Select', 'click', 'Click', 'choose', 'press', 'open', 'tool', 'menu', 'button', 'dialog',
+    'if', 'If', 'when', 'then', 'Then', 'otherwise', 'else', 'unless', 'should', 'in case', 'see section',
+    'configure', 'setup', 'install', 'settings', 'options', 'preferences', 'troubleshoot', 'fix', 'error',
+    'PDF', 'pdf', 'Adobe', 'Acrobat', 'document', 'documents', 'file', 'template', 'text', 'checkbox',
+    'hotel', 'restaurant', 'museum', 'visit', 'tour', 'Day 1', 'Morning', 'address', 'phone', 'hours',
+    'revenue', 'profit', 'quarterly', 'Q3', 'FY2024', '20%', '€15', '$9.99', '£5', '10 km', '12:30',
+    'www.x.com', '@a.b', 'Step 1', 'first', 'next', 'finally', 'after', 'once', 'before',
+    '1.', '2.', '3)', '•', '-', '*', 'a)', '12.', ':', ';', '>', '_', 'x_form', 'form_x', 'formx',
+    'İ', 'ı', 'ſ', 'K', 'é', 'café', 'naïve', 'ß', '\xa0', ' ', '　',
+    'Clıck', 'fıeld', 'edıt', 'Fİrst', 'İnstall', 'ſelect', 'ſhare', 'ſettings', 'preſs', 'ıf',
+    '\n', '\n', '\n', '\n  ', '\n    ', '\t'
+]
+
+def random_texts(count, seed=0):
+    """Seeded random texts mixing the tokens with spaces, newlines and colons"""
+    rng = random.Random(seed)
+    return [
+        ''.join(rng.choice(TOKENS) + rng.choice([' ', ' ', '', '\n', ': ']) for _ in range(rng.randint(1, 120)))
+        for _ in range(count)
+    ]
+
+TEXTS = SAMPLE_TEXTS + random_texts(300)
+
+def baseline_keyword_counts(content):
+    """Procedural and UI interaction element counts from case-insensitive re scans of the original content"""
+    return +Counter({
+        'sequential_words': len(re.findall(r'\b(?:first|second|third|next|then|finally|after|before)\b', content, re.IGNORECASE)),
+        'conditional_words': len(re.findall(r'\b(?:if|when|unless|should|depending|based on)\b', content, re.IGNORECASE)),
+        'indented_lines': len(re.findall(r'^\s{4,}[^\s]', content, re.MULTILINE)),
+        'ui_actions': len(re.findall(r'\b(?:click|select|choose|press|drag|drop|type|enter|hover|scroll)\b', content, re.IGNORECASE)),
+        'ui_elements': len(re.findall(r'\b(?:button|menu|toolbar|panel|dialog|window|field|checkbox|dropdown|tab)\b', content, re.IGNORECASE)),
+        'specific_ui': len(re.findall(r'\b(?:All tools|File menu|Edit menu|View menu|Properties panel)\b', content, re.IGNORECASE))
+    })
+
+def baseline_pattern_matches(content, job_config):
+    """Required pattern matches from case-insensitive re scans of the original content"""
+    return sum(len(re.findall(pattern.pattern, content, re.IGNORECASE | re.MULTILINE)) for pattern in job_config['required_patterns'])
+
+def test_indicator_automaton_matches_patterns():
+    """The automaton's manual word boundaries and span indicators count like the indicator patterns"""
+    analyzer = EnhancedAdaptiveDocumentAnalyzer()
+    
+    reference_indicators = {
+        'structural': {category: info['indicators'] for category, info in analyzer.structural_patterns.items()},
+        'job': analyzer.job_indicators
+    }
+    
+    for text in TEXTS:
+        for group, categories in reference_indicators.items():
+            expected = {category: [len(pattern.findall(text)) for pattern in patterns] for category, patterns in categories.items()}
+            assert analyzer.count_indicator_matches(group, text) == expected, (group, text)
+
+def test_window_indicator_matches_sum_their_lines():
+    """Window counts attributed from one scan of all lines equal the counts of each window's own text"""
+    analyzer = EnhancedAdaptiveDocumentAnalyzer()
+    reference = EnhancedAdaptiveDocumentAnalyzer()
+    reference.indicator_automaton = None
+    
+    for text in TEXTS:
+        lines = text.split('\n')
+        windows = [(start, min(start + 4, len(lines))) for start in range(0, len(lines), 2)]
+        for group in ('structural', 'job'):
+            expected = [reference.count_indicator_matches(group, '\n'.join(lines[start:end])) for start, end in windows]
+            assert analyzer.count_window_indicator_matches(group, lines, windows) == expected, (group, text)
+
+def test_pattern_set_matches_patterns():
+    """The RE2 set reports a match for exactly the patterns re finds in the content"""
+    signatures = EnhancedStructuralSignatures()
+    
+    for text in TEXTS:
+        matched_patterns = signatures.match_pattern_set(text)
+        if matched_patterns is None:
+            continue
+        assert matched_patterns == {pattern: pattern.search(text) is not None for pattern in signatures.set_patterns}, text
+
+def test_literal_density_counts_match_patterns():
+    """Literal density phrases counted by the automaton add up to the density pattern counts"""
+    for text in TEXTS:
+        literal_counts = enhanced_structural_signatures._count_literal_matches(text)
+        if literal_counts is None:
+            continue
+        for indicator, patterns in enhanced_structural_signatures._DENSITY_PATTERNS.items():
+            residual_matches = sum(len(pattern.findall(text)) for pattern in enhanced_structural_signatures._DENSITY_RESIDUAL_RES[indicator])
+            expected = sum(len(re.findall(pattern, text, re.IGNORECASE)) for pattern in patterns)
+            assert literal_counts[indicator] + residual_matches == expected, (indicator, text)
+
+def test_signature_scores_match_stdlib_scores():
+    """Signature scores with the RE2 set and the density automaton equal the plain re scores"""
+    signatures = EnhancedStructuralSignatures()
+    reference = EnhancedStructuralSignatures()
+    reference.pattern_set, reference.set_patterns = None, []
+    
+    with mock.patch.object(enhanced_structural_signatures, '_DENSITY_AUTOMATON', None):
+        expected_scores = [
+            [reference.analyze_structural_signature([{'content': text}], persona, job) for persona, job in reference.signatures_by_pair]
+            for text in TEXTS
+        ]
+    
+    for text, expected in zip(TEXTS, expected_scores):
+        scores = [signatures.analyze_structural_signature([{'content': text}], persona, job) for persona, job in signatures.signatures_by_pair]
+        assert scores == expected, text
+
+def test_keyword_elements_match_stdlib_patterns():
+    """Keyword elements counted on lowercased content or by the automaton match the case-insensitive scans"""
+    analyzer = AutoAdaptiveDocumentAnalyzer()
+    
+    for text in TEXTS:
+        assert +analyzer.count_keyword_elements(text) == baseline_keyword_counts(text), text
+
+def test_unanchored_patterns_match_stdlib_patterns():
+    """The selected window patterns find the required pattern matches at the same offsets"""
+    analyzer = AutoAdaptiveDocumentAnalyzer()
+    
+    for text in TEXTS:
+        content_lower = auto_adaptive_analyzer._lower_for_matching(text)
+        scanned_text = text if content_lower is None else content_lower
+        for job_config in analyzer.job_configs.values():
+            found = Counter()
+            for pattern, word_weights in analyzer.select_unanchored_patterns(content_lower, job_config):
+                for match in pattern.finditer(scanned_text):
+                    found[match.start()] += word_weights[match.group()] if word_weights is not None else 1
+            expected = Counter(
+                match.start() for pattern in job_config['required_patterns'] if pattern not in job_config['numbered_step_patterns']
+                for match in re.finditer(pattern.pattern, text, re.IGNORECASE | re.MULTILINE)
+            )
+            assert found == expected, text
+
+def test_window_features_match_stdlib_patterns():
+    """Window pattern and keyword counts match the case-insensitive scans of the window"""
+    analyzer = AutoAdaptiveDocumentAnalyzer()
+    
+    for text in TEXTS:
+        for job_config in analyzer.job_configs.values():
+            features = analyzer.count_window_features(text, job_config)
+            assert features['pattern_matches'] == baseline_pattern_matches(text, job_config), text
+            assert +features['keywords'] == baseline_keyword_counts(text), text
+
+def test_sliding_window_features_match_stdlib_patterns():
+    """Per-line cumulative window counts equal the case-insensitive scans of each window"""
+    analyzer = AutoAdaptiveDocumentAnalyzer()
+    window_size, step_size = 4, 2
+    
+    for text in TEXTS:
+        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        window_starts = range(0, len(lines) - window_size + 1, step_size)
+        window_contents = ['\n'.join(lines[i:i + window_size]) for i in window_starts]
+        
+        for job_config in analyzer.job_configs.values():
+            window_features = analyzer.count_sliding_window_features(lines, window_starts, window_contents, window_size, job_config)
+            
+            for features, content_text in zip(window_features, window_contents):
+                assert features['pattern_matches'] == baseline_pattern_matches(content_text, job_config), text
+                assert features['structural'] == analyzer.count_structural_elements(content_text), text
+                assert +features['keywords'] == baseline_keyword_counts(content_text), text
+                assert features['word_count'] == len(content_text.split()), text
+
+def test_indicator_word_counts_match_patterns():
+    """Whole-word indicators counted from the lowercased word tally match their patterns"""
+    indicator_groups = (
+        run_enhanced_auto_analysis._ADOBE_INDICATOR_RES, run_enhanced_auto_analysis._TRAVEL_INDICATOR_RES,
+        run_enhanced_auto_analysis._BUSINESS_INDICATOR_RES, (run_enhanced_auto_analysis._FORM_INDICATOR_RE,),
+        (run_enhanced_auto_analysis._COLLABORATION_INDICATOR_RE,), (run_enhanced_auto_analysis._CREATION_INDICATOR_RE,)
+    )
+    
+    for text in TEXTS:
+        if run_enhanced_auto_analysis.CASE_FOLD_EXCEPTION_RE.search(text):
+            continue
+        word_counts = Counter(run_enhanced_auto_analysis._WORD_RE.findall(text.lower()))
+        for patterns in indicator_groups:
+            expected = sum(len(pattern.findall(text)) for pattern in patterns)
+            assert run_enhanced_auto_analysis._count_indicator_matches(patterns, text, word_counts) == expected, text
+
+if __name__ == "__main__":
+    test_indicator_automaton_matches_patterns()
+    test_window_indicator_matches_sum_their_lines()
+    test_pattern_set_matches_patterns()
+    test_literal_density_counts_match_patterns()
+    test_signature_scores_match_stdlib_scores()
+    test_keyword_elements_match_stdlib_patterns()
+    test_unanchored_patterns_match_stdlib_patterns()
+    test_window_features_match_stdlib_patterns()
+    test_sliding_window_features_match_stdlib_patterns()
+    test_indicator_word_counts_match_patterns()
+    print("✅ Fast paths match the stdlib re paths")
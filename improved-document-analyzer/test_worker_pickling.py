@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+import multiprocessing
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Add the current directory to the path
+sys.path.append(str(Path(__file__).parent))
+
+import enhanced_adaptive_analyzer
+import structural_document_analyzer
+from enhanced_adaptive_analyzer import EnhancedAdaptiveDocumentAnalyzer
+from structural_document_analyzer import StructuralDocumentAnalyzer
+
+# The analyzers send themselves to their pool workers as initializer arguments, so they
+# must survive pickling; spawned workers (the default on Windows and macOS) receive
+# nothing else from the parent process
+
+# Content blocks with procedural, cross-referencing and non-ASCII content
+SAMPLE_BLOCKS = [
+    {'content': "Create a fillable form\n1. Open the PDF in Acrobat\n2. Select Prepare a Form\n3. Click Start to detect form fields"},
+    {'content': "If the form has no fields, then add text fields manually.\nSee section 2 for signature fields.\n• Name: required\n• Date: 12:30"},
+    {'content': "Day 1: visit the museum (€15) and the old town\nHotel Nice, 10 km from the airport\nCafé İstanbul — ſpecial menu, 20% off"}
+]
+
+SIGNATURE_PAIRS = [
+    ('hr_professional', 'create_manage_forms'),
+    ('travel_planner', 'plan_group_trip'),
+    ('software_learner', 'learn_software_features')
+]
+
+def score_signatures(analyzer):
+    """Score the sample blocks against every signature with an enhanced analyzer"""
+    signatures = analyzer.structural_signatures
+    return [signatures.analyze_structural_signature(SAMPLE_BLOCKS, persona, job) for persona, job in SIGNATURE_PAIRS]
+
+def score_signatures_in_worker():
+    """Score the sample blocks with the analyzer a worker process received from its initializer"""
+    return score_signatures(enhanced_adaptive_analyzer._worker_analyzer)
+
+def spawn_pool(initializer, analyzer):
+    """A single spawned worker process that receives the analyzer through its initializer"""
+    return ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context('spawn'),
+        initializer=initializer, initargs=(analyzer,)
+    )
+
+def test_enhanced_analyzer_survives_pickling():
+    """An unpickled enhanced analyzer scores like the original one"""
+    analyzer = EnhancedAdaptiveDocumentAnalyzer()
+    restored = pickle.loads(pickle.dumps(analyzer))
+    
+    assert score_signatures(restored) == score_signatures(analyzer)
+    
+    all_content = '\n'.join(block['content'] for block in SAMPLE_BLOCKS[:2])
+    assert (restored.structural_signatures.match_pattern_set(all_content) ==
+            analyzer.structural_signatures.match_pattern_set(all_content))
+
+def test_enhanced_analyzer_reaches_spawned_worker():
+    """A spawned worker scores with the analyzer it was given like the parent process"""
+    analyzer = EnhancedAdaptiveDocumentAnalyzer()
+    
+    with spawn_pool(enhanced_adaptive_analyzer._init_document_worker, analyzer) as executor:
+        assert executor.submit(score_signatures_in_worker).result() == score_signatures(analyzer)
+
+def test_structural_analyzer_reaches_spawned_worker():
+    """A spawned worker extracts the sections of a document like the parent process"""
+    analyzer = StructuralDocumentAnalyzer()
+    pdf_path = str(sorted((Path(__file__).parent / "documents").glob("*.pdf"))[0])
+    
+    with spawn_pool(structural_document_analyzer._init_document_worker, analyzer) as executor:
+        worker_result = executor.submit(structural_document_analyzer._process_document_in_worker, pdf_path).result()
+    
+    assert worker_result == analyzer.process_single_document(pdf_path)
+
+if __name__ == "__main__":
+    test_enhanced_analyzer_survives_pickling()
+    test_enhanced_analyzer_reaches_spawned_worker()
+    test_structural_analyzer_reaches_spawned_worker()
+    print("✅ Analyzers survive pickling and spawned worker processes")
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+
+"""
+Character checks shared by the fast matching paths, deciding when lowercased content,
+a hand-rolled word boundary or RE2 may stand in for case-insensitive stdlib re matching
+"""
+
+import re
+
+# The only characters for which case-insensitive matching disagrees with lower()
+CASE_FOLD_EXCEPTION_RE = re.compile('[\u0130\u0131\u017f]')
+
+# RE2's \w, \d and \b are ASCII only, its \s is [\t\n\f\r ], and only letters fold under
+# case-insensitive matching, so content without a non-ASCII word character or other
+# whitespace is matched by RE2 exactly as by re
+RE2_MISMATCH_CHAR_RE = re.compile(r'[^\W\x00-\x7f]|[^\S\t\n\f\r ]')
+
+def is_word_char(char: str) -> bool:
+    """Match the regex engine's notion of a \\w character"""
+    return char.isalnum() or char == '_'